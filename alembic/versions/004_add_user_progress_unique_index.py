@@ -0,0 +1,41 @@
+"""Add unique (user_id, content_node_id) index to user_progress
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the composite unique index used by progress lookups and upserts."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('user_progress'):
+        return
+    # IF NOT EXISTS keeps the migration transaction usable when the index (or
+    # the UNIQUE constraint backing it, for tables created from models) exists.
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_user_content_progress "
+        "ON user_progress (user_id, content_node_id)"
+    )
+
+
+def downgrade() -> None:
+    """Drop the composite unique index from user_progress."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('user_progress'):
+        return
+    constraints = {uc['name'] for uc in inspector.get_unique_constraints('user_progress')}
+    if 'uq_user_content_progress' in constraints and op.get_bind().dialect.name != 'sqlite':
+        op.drop_constraint('uq_user_content_progress', 'user_progress', type_='unique')
+    else:
+        op.execute("DROP INDEX IF EXISTS uq_user_content_progress")
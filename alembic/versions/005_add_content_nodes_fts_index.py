@@ -0,0 +1,32 @@
+"""Add full-text search GIN index to content_nodes
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the GIN index used by the database search fallback (PostgreSQL only)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_content_nodes_fts ON content_nodes "
+        "USING GIN (to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(content, '')))"
+    )
+
+
+def downgrade() -> None:
+    """Drop the full-text search GIN index."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_content_nodes_fts")
@@ -0,0 +1,62 @@
+"""Store AI table timestamps as TIMESTAMPTZ instead of {"iso": ...} JSON
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+TIMESTAMP_COLUMNS = {
+    'ai_configurations': ('created_at', 'updated_at'),
+    'ai_jobs': ('started_at', 'completed_at', 'created_at', 'updated_at'),
+    'ai_block_suggestions': ('approved_at', 'rejected_at', 'created_at', 'updated_at'),
+}
+
+
+def upgrade() -> None:
+    """Convert {"iso": ...} JSON timestamps to native timestamps.
+
+    The stored ISO strings are naive UTC (datetime.utcnow()).
+    """
+    dialect = op.get_bind().dialect.name
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        for column in columns:
+            if dialect == 'postgresql':
+                op.execute(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE TIMESTAMP WITH TIME ZONE "
+                    f"USING (({column}::json ->> 'iso')::timestamp AT TIME ZONE 'UTC')"
+                )
+            else:
+                # SQLite keeps the declared type; rewrite the values in the
+                # 'YYYY-MM-DD HH:MM:SS.ffffff' form SQLAlchemy's DateTime reads
+                op.execute(
+                    f"UPDATE {table} SET {column} = replace(json_extract({column}, '$.iso'), 'T', ' ') "
+                    f"WHERE {column} IS NOT NULL"
+                )
+
+
+def downgrade() -> None:
+    """Convert native timestamps back to {"iso": ...} JSON."""
+    dialect = op.get_bind().dialect.name
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        for column in columns:
+            if dialect == 'postgresql':
+                op.execute(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSON "
+                    f"USING CASE WHEN {column} IS NULL THEN NULL ELSE json_build_object("
+                    f"'iso', to_char({column} AT TIME ZONE 'UTC', 'YYYY-MM-DD\"T\"HH24:MI:SS.US')) END"
+                )
+            else:
+                op.execute(
+                    f"UPDATE {table} SET {column} = json_object('iso', replace({column}, ' ', 'T')) "
+                    f"WHERE {column} IS NOT NULL"
+                )
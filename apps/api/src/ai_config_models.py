@@ -2,7 +2,7 @@
 AI Configuration models for agent setup and management.
 """
 from datetime import datetime
-from sqlalchemy import Column, String, JSON, Boolean, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, JSON, Boolean, DateTime, ForeignKey, Text, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 import enum
 
@@ -103,8 +103,8 @@ class AIConfiguration(Base):
     daily_request_limit = Column(JSON, nullable=True, default={"value": 50})
     
     is_active = Column(Boolean, default=True, nullable=False)
-    created_at = Column(JSON, nullable=False)
-    updated_at = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
     
     # Relationships
     user = relationship("User", back_populates="ai_configurations")
@@ -131,16 +131,16 @@ class AIJob(Base):
     suggested_blocks = Column(JSON, nullable=True)  # Block IDs found via MCP
     
     # Execution tracking
-    started_at = Column(JSON, nullable=True)
-    completed_at = Column(JSON, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
     error_message = Column(Text, nullable=True)
     
     # Resource usage
     tokens_used = Column(JSON, nullable=True, default={"prompt": 0, "completion": 0})
     execution_time_ms = Column(JSON, nullable=True)
     
-    created_at = Column(JSON, nullable=False)
-    updated_at = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
     
     # Relationships
     configuration = relationship("AIConfiguration", back_populates="ai_jobs")
@@ -173,12 +173,12 @@ class AIBlockSuggestion(Base):
     status = Column(String(20), nullable=False, default="pending")  # pending, approved, rejected
     user_feedback = Column(Text, nullable=True)
     
-    approved_at = Column(JSON, nullable=True)
-    rejected_at = Column(JSON, nullable=True)
+    approved_at = Column(DateTime(timezone=True), nullable=True)
+    rejected_at = Column(DateTime(timezone=True), nullable=True)
     created_block_id = Column(GUID, ForeignKey("content_nodes.id"), nullable=True)
     
-    created_at = Column(JSON, nullable=False)
-    updated_at = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
     
     # Relationships
     ai_job = relationship("AIJob", back_populates="suggestions")
@@ -1,10 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Union
+import asyncio
+import os
 import secrets
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, or_
+from sqlalchemy.exc import IntegrityError
 from .models import User
 from .config import settings
 import logging
@@ -18,6 +22,12 @@ pwd_context = CryptContext(
     bcrypt__rounds=12  # Strong hashing
 )
 
+# bcrypt is CPU-bound; run it off the event loop, one worker per core
+_password_pool = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="password-hash",
+)
+
 
 class JWTManager:
     def __init__(self):
@@ -105,13 +115,25 @@ class AuthManager:
         """Hash password with bcrypt"""
         return self.pwd_context.hash(password)
 
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """verify_password in the password worker pool, keeping the event loop free"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _password_pool, self.verify_password, plain_password, hashed_password
+        )
+
+    async def get_password_hash_async(self, password: str) -> str:
+        """get_password_hash in the password worker pool, keeping the event loop free"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_pool, self.get_password_hash, password)
+
     async def authenticate_user(self, db: AsyncSession, username: str, password: str) -> Optional[User]:
         result = await db.execute(select(User).where(User.username == username))
         user = result.scalar_one_or_none()
 
         if not user:
             return None
-        if not self.verify_password(password, user.hashed_password):
+        if not await self.verify_password_async(password, user.hashed_password):
             return None
         return user
 
@@ -123,6 +145,15 @@ class AuthManager:
         result = await db.execute(select(User).where(User.email == email))
         return result.scalar_one_or_none()
 
+    async def get_user_by_username_or_email(self, db: AsyncSession, username: str, email: str) -> list:
+        """Return (username, email) rows matching either value in one query"""
+        result = await db.execute(
+            select(User.username, User.email).where(
+                or_(User.username == username, User.email == email)
+            )
+        )
+        return result.all()
+
     async def create_user(self, db: AsyncSession, username: str, email: str, password: str, full_name: str = None) -> User:
         """Create new user with validation and secure password hashing"""
         
@@ -141,15 +172,7 @@ class AuthManager:
         if not email or '@' not in email:
             raise ValueError("Invalid email format")
         
-        # Guard unique constraints at app-level
-        existing_username = await self.get_user_by_username(db, username)
-        if existing_username:
-            raise ValueError("username_taken")
-        existing_email = await self.get_user_by_email(db, email)
-        if existing_email:
-            raise ValueError("email_taken")
-
-        hashed_password = self.get_password_hash(password)
+        hashed_password = await self.get_password_hash_async(password)
         user = User(
             username=username,
             email=email,
@@ -157,7 +180,17 @@ class AuthManager:
             full_name=full_name
         )
         db.add(user)
-        await db.commit()
+        # Uniqueness is enforced by the database; map violations to error codes
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            existing = await self.get_user_by_username_or_email(db, username, email)
+            if any(row.username == username for row in existing):
+                raise ValueError("username_taken") from e
+            if any(row.email == email for row in existing):
+                raise ValueError("email_taken") from e
+            raise
         await db.refresh(user)
         
         logger.info(f"User created: {username} (email: {email})")
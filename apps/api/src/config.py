@@ -25,6 +25,9 @@ class Settings(BaseSettings):
     # Database
     database_url: str = Field("sqlite+aiosqlite:///./notimetolie.db", alias="DATABASE_URL")
     database_test_url: str = Field("sqlite+aiosqlite:///./notimetolie_test.db", alias="DATABASE_URL_TEST")
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800
 
     # Redis
     redis_url: str = "redis://localhost:6379"
@@ -109,6 +112,10 @@ class Settings(BaseSettings):
     xp_per_path_created: int = 20
     levels_xp_requirements: List[int] = [100, 300, 600, 1000, 1500, 2100, 2800, 3600, 4500, 5500]
 
+    # AI jobs
+    ai_max_concurrency: int = 8
+    ai_request_timeout: float = 120
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
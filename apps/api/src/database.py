@@ -1,7 +1,7 @@
 import os
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 
 from .config import settings
 
@@ -13,7 +13,17 @@ def _engine_for_url(url: str, echo: bool):
             kwargs["poolclass"] = StaticPool
         return create_async_engine(url, **kwargs)
     try:
-        return create_async_engine(url, echo=echo, future=True)
+        # Keep a warm pool so requests don't pay connection setup
+        return create_async_engine(
+            url,
+            echo=echo,
+            future=True,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_pre_ping=True,
+            pool_recycle=settings.db_pool_recycle,
+        )
     except ModuleNotFoundError as e:
         # Fallback to in-memory SQLite if asyncpg or other DBAPI is missing
         return create_async_engine(
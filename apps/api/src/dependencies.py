@@ -73,19 +73,23 @@ async def get_current_user_optional(
 
 
 def require_role(required_role: str):
+    # Resolve the role once when the dependency is declared, not per request
+    try:
+        role_enum = UserRole(required_role)
+    except ValueError:
+        role_enum = None
+
     def role_checker(current_user: User = Depends(get_current_active_user)):
-        try:
-            role_enum = UserRole(required_role)
-            if current_user.role != role_enum:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Insufficient permissions"
-                )
-        except ValueError:
+        if role_enum is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid role specified"
             )
+        if current_user.role != role_enum:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient permissions"
+            )
         return current_user
     return role_checker
 
@@ -9,6 +9,7 @@ except Exception:
         pass
 
 from ..services.search import index_node, delete_node, ensure_index_bootstrapped
+from ..services.mcp_client import clear_search_cache as clear_mcp_search_cache
 from ..config import settings
 
 from .events import (
@@ -62,6 +63,11 @@ async def search_index_listener(event: Event) -> None:
         return None
 
 
+def mcp_cache_listener(event: Event) -> None:
+    """Invalidate memoized MCP block searches when content changes."""
+    clear_mcp_search_cache()
+
+
 def notification_listener(event: Event) -> None:
     """
     Basic notification listener stub.
@@ -2,8 +2,11 @@ from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
@@ -20,8 +23,9 @@ from .routers import websocket as websocket_router
 from .routers import ai_config as ai_router
 from .routers import auth as auth_router
 from .services.search import ensure_index_bootstrapped
+from .services.ai_providers import close_shared_clients
 from .events.bus import bus
-from .events.listeners import search_index_listener, notification_listener
+from .events.listeners import search_index_listener, notification_listener, mcp_cache_listener
 from .events.logging_listener import logging_listener
 from .events.events import (
     UserRegistered,
@@ -35,14 +39,27 @@ from .events.events import (
 )
 
 
-# Configure structured logging
+# Configure structured logging. Records are queued and written by a listener
+# thread, so stdout/file writes don't block the event loop
+_log_handlers = [
+    logging.StreamHandler(sys.stdout),
+    logging.FileHandler(f"{settings.app_name.lower().replace(' ', '_')}.log") if settings.environment == "production" else logging.NullHandler()
+]
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+# Flush queued records on interpreter exit
+atexit.register(_log_listener.stop)
+# The queue handler only merges message and args (plus any traceback); the
+# listener's handlers apply the full format
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter())
 logging.basicConfig(
     level=logging.INFO if settings.environment != "production" else logging.WARNING,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler(f"{settings.app_name.lower().replace(' ', '_')}.log") if settings.environment == "production" else logging.NullHandler()
-    ]
+    handlers=[_queue_handler]
 )
 logger = logging.getLogger(__name__)
 
@@ -214,10 +231,19 @@ async def init_startup():
     bus.subscribe(PathUpdated, search_index_listener)
     bus.subscribe(PathDeleted, search_index_listener)
     bus.subscribe(SuggestionCreated, notification_listener)
+    for evt in (BlockCreated, BlockUpdated, BlockDeleted, PathCreated, PathUpdated, PathDeleted):
+        bus.subscribe(evt, mcp_cache_listener)
     # Log all events for visibility in dev
     for evt in (UserRegistered, BlockCreated, BlockUpdated, BlockDeleted, PathCreated, PathUpdated, PathDeleted, SuggestionCreated):
         bus.subscribe(evt, logging_listener)
 
+
+@app.on_event("shutdown")
+async def close_ai_clients():
+    # Close pooled AI provider connections
+    await close_shared_clients()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -329,6 +329,8 @@ class UserProgress(Base):
     user = relationship("User", backref="progress")
     content_node = relationship("ContentNode")
 
+    # The (user_id, content_node_id) unique index serves every progress lookup
+    # and is the conflict target for idempotent ON CONFLICT DO NOTHING inserts.
     __table_args__ = (
         UniqueConstraint('user_id', 'content_node_id', name='uq_user_content_progress'),
         Index('ix_user_progress_user_id_mastered_at', 'user_id', 'mastered_at'),
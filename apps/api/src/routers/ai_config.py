@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel, Field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import uuid
 import httpx
 
@@ -21,7 +21,7 @@ from src.ai_config_models import (
 )
 from src.models import User
 from src.utils.encryption import encrypt_api_key, decrypt_api_key
-from src.services.ai_processor import start_ai_job_background
+from src.services.ai_processor import run_ai_job, clear_api_key_cache
 
 router = APIRouter(prefix="/v1/ai", tags=["AI Configuration"])
 
@@ -120,7 +120,7 @@ async def create_ai_configuration(
     current_user: User = Depends(require_permission("use_ai_agents")),
 ):
     """Create a new AI agent configuration."""
-    now = datetime.utcnow().isoformat()
+    now = datetime.now(timezone.utc)
     
     # Encrypt API key if provided
     encrypted_key = None
@@ -148,8 +148,8 @@ async def create_ai_configuration(
         can_search_web=config_data.can_search_web,
         daily_request_limit={"value": config_data.daily_request_limit},
         is_active=True,
-        created_at={"iso": now},
-        updated_at={"iso": now},
+        created_at=now,
+        updated_at=now,
     )
     
     db.add(config)
@@ -167,7 +167,7 @@ async def create_ai_configuration(
         max_tokens=config.max_tokens.get("value", 2000),
         mcp_enabled=config.mcp_enabled,
         is_active=config.is_active,
-        created_at=config.created_at.get("iso"),
+        created_at=config.created_at.isoformat(),
     )
 
 
@@ -196,7 +196,7 @@ async def list_ai_configurations(
             max_tokens=c.max_tokens.get("value", 2000),
             mcp_enabled=c.mcp_enabled,
             is_active=c.is_active,
-            created_at=c.created_at.get("iso"),
+            created_at=c.created_at.isoformat(),
         )
         for c in configs
     ]
@@ -233,7 +233,7 @@ async def get_ai_configuration(
         max_tokens=config.max_tokens.get("value", 2000),
         mcp_enabled=config.mcp_enabled,
         is_active=config.is_active,
-        created_at=config.created_at.get("iso"),
+        created_at=config.created_at.isoformat(),
     )
 
 
@@ -258,7 +258,7 @@ async def update_ai_configuration(
             detail="AI configuration not found"
         )
     
-    now = datetime.utcnow().isoformat()
+    now = datetime.now(timezone.utc)
     
     # Update fields
     config.name = config_data.name
@@ -277,11 +277,12 @@ async def update_ai_configuration(
     config.can_edit_blocks = config_data.can_edit_blocks
     config.can_search_web = config_data.can_search_web
     config.daily_request_limit = {"value": config_data.daily_request_limit}
-    config.updated_at = {"iso": now}
+    config.updated_at = now
     
     # Encrypt API key if provided
     if config_data.api_key:
         config.api_key_encrypted = encrypt_api_key(config_data.api_key)
+        clear_api_key_cache()
     
     await db.commit()
     await db.refresh(config)
@@ -297,7 +298,7 @@ async def update_ai_configuration(
         max_tokens=config.max_tokens.get("value", 2000),
         mcp_enabled=config.mcp_enabled,
         is_active=config.is_active,
-        created_at=config.created_at.get("iso"),
+        created_at=config.created_at.isoformat(),
     )
 
 
@@ -323,9 +324,10 @@ async def delete_ai_configuration(
     
     # Soft delete by setting is_active to False
     config.is_active = False
-    config.updated_at = {"iso": datetime.utcnow().isoformat()}
+    config.updated_at = datetime.now(timezone.utc)
     
     await db.commit()
+    clear_api_key_cache()
     
     return None
 
@@ -352,7 +354,7 @@ async def create_ai_job(
             detail="AI configuration not found"
         )
     
-    now = datetime.utcnow().isoformat()
+    now = datetime.now(timezone.utc)
     
     job = AIJob(
         id=str(uuid.uuid4()),
@@ -362,16 +364,17 @@ async def create_ai_job(
         status=AIJobStatus.PENDING,
         input_prompt=job_data.input_prompt,
         input_metadata=job_data.input_metadata or {},
-        created_at={"iso": now},
-        updated_at={"iso": now},
+        created_at=now,
+        updated_at=now,
     )
     
     db.add(job)
     await db.commit()
     await db.refresh(job)
     
-    # Start background processing
-    background_tasks.add_task(start_ai_job_background, str(job.id), str(config.id))
+    # Start background processing on the app's event loop (an async task is
+    # awaited after the response, not sent to a thread with its own loop)
+    background_tasks.add_task(run_ai_job, str(job.id), str(config.id))
     
     return AIJobPublic(
         id=str(job.id),
@@ -381,10 +384,10 @@ async def create_ai_job(
         input_prompt=job.input_prompt,
         output_data=job.output_data,
         suggested_blocks=job.suggested_blocks,
-        started_at=job.started_at.get("iso") if job.started_at else None,
-        completed_at=job.completed_at.get("iso") if job.completed_at else None,
+        started_at=job.started_at.isoformat() if job.started_at else None,
+        completed_at=job.completed_at.isoformat() if job.completed_at else None,
         error_message=job.error_message,
-        created_at=job.created_at.get("iso"),
+        created_at=job.created_at.isoformat(),
     )
 
 
@@ -401,7 +404,7 @@ async def list_ai_jobs(
     jobs = result.scalars().all()
     
     # Sort in Python since JSON field ordering is complex in SQLAlchemy
-    jobs = sorted(jobs, key=lambda j: j.created_at.get("iso", ""), reverse=True)
+    jobs = sorted(jobs, key=lambda j: j.created_at, reverse=True)
     
     return [
         AIJobPublic(
@@ -412,10 +415,10 @@ async def list_ai_jobs(
             input_prompt=job.input_prompt,
             output_data=job.output_data,
             suggested_blocks=job.suggested_blocks,
-            started_at=job.started_at.get("iso") if job.started_at else None,
-            completed_at=job.completed_at.get("iso") if job.completed_at else None,
+            started_at=job.started_at.isoformat() if job.started_at else None,
+            completed_at=job.completed_at.isoformat() if job.completed_at else None,
             error_message=job.error_message,
-            created_at=job.created_at.get("iso"),
+            created_at=job.created_at.isoformat(),
         )
         for job in jobs
     ]
@@ -449,10 +452,10 @@ async def get_ai_job(
         input_prompt=job.input_prompt,
         output_data=job.output_data,
         suggested_blocks=job.suggested_blocks,
-        started_at=job.started_at.get("iso") if job.started_at else None,
-        completed_at=job.completed_at.get("iso") if job.completed_at else None,
+        started_at=job.started_at.isoformat() if job.started_at else None,
+        completed_at=job.completed_at.isoformat() if job.completed_at else None,
         error_message=job.error_message,
-        created_at=job.created_at.get("iso"),
+        created_at=job.created_at.isoformat(),
     )
 
 
@@ -484,8 +487,8 @@ async def cancel_ai_job(
     
     job.status = AIJobStatus.CANCELLED
     job.error_message = "Cancelled by user"
-    job.completed_at = {"iso": datetime.utcnow().isoformat()}
-    job.updated_at = {"iso": datetime.utcnow().isoformat()}
+    job.completed_at = datetime.now(timezone.utc)
+    job.updated_at = job.completed_at
     
     await db.commit()
     
@@ -533,7 +536,7 @@ async def list_job_suggestions(
             confidence_score=s.confidence_score.get("value", 0.0),
             ai_rationale=s.ai_rationale,
             status=s.status,
-            created_at=s.created_at.get("iso"),
+            created_at=s.created_at.isoformat(),
         )
         for s in suggestions
     ]
@@ -569,8 +572,8 @@ async def approve_ai_suggestion(
     # block = await create_block_from_suggestion(suggestion, db, current_user)
     
     suggestion.status = "approved"
-    suggestion.approved_at = {"iso": datetime.utcnow().isoformat()}
-    suggestion.updated_at = {"iso": datetime.utcnow().isoformat()}
+    suggestion.approved_at = datetime.now(timezone.utc)
+    suggestion.updated_at = suggestion.approved_at
     
     await db.commit()
     
@@ -606,8 +609,8 @@ async def reject_ai_suggestion(
     
     suggestion.status = "rejected"
     suggestion.user_feedback = feedback
-    suggestion.rejected_at = {"iso": datetime.utcnow().isoformat()}
-    suggestion.updated_at = {"iso": datetime.utcnow().isoformat()}
+    suggestion.rejected_at = datetime.now(timezone.utc)
+    suggestion.updated_at = suggestion.rejected_at
     
     await db.commit()
     
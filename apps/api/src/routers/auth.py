@@ -107,12 +107,7 @@ async def google_auth(
             data={
                 "sub": user.username,
                 "id": str(user.id),
-                "email": user.email,
-                "full_name": user.full_name,
-                "is_active": bool(user.is_active),
-                "is_verified": bool(user.is_verified),
-                "xp": int(user.xp),
-                "level": int(user.level),
+                "role": user.role.value,
             },
             expires_delta=access_token_expires,
         )
@@ -2,19 +2,36 @@
 Progress tracking router for user mastery/checkpoint features.
 """
 from typing import List
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, or_, literal, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from pydantic import BaseModel
 import uuid
 
 from ..database import get_db
-from ..models import User, UserProgress, ContentNode, NodeLevel
+from ..models import User, UserProgress, ContentNode, NodeLevel, GUID
 from ..dependencies import get_current_active_user
 
 router = APIRouter()
 
 
+_DIALECT_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+def _dialect_insert(db: AsyncSession):
+    """Return the dialect-specific insert() that supports ON CONFLICT DO NOTHING"""
+    dialect = db.get_bind().dialect.name
+    try:
+        return _DIALECT_INSERTS[dialect]
+    except KeyError:
+        raise NotImplementedError(f"ON CONFLICT upserts are not supported on {dialect}")
+
+
 class ProgressResponse(BaseModel):
     id: str
     content_node_id: str
@@ -35,46 +52,48 @@ async def mark_block_mastered(
     try:
         block_uuid = uuid.UUID(block_id)
         
-        # Check if block exists
-        result = await db.execute(
-            select(ContentNode).where(
-                ContentNode.id == block_uuid,
-                ContentNode.level == NodeLevel.BLOCK
-            )
+        # Validate the block and create the progress record in one statement;
+        # nothing comes back if the block is missing or already mastered
+        insert = _dialect_insert(db)
+        block_select = select(
+            literal(current_user.id, GUID()), ContentNode.id
+        ).where(
+            ContentNode.id == block_uuid,
+            ContentNode.level == NodeLevel.BLOCK
         )
-        block = result.scalar_one_or_none()
-        
-        if not block:
-            raise HTTPException(status_code=404, detail="Block not found")
-        
-        # Check if already mastered
         result = await db.execute(
-            select(UserProgress).where(
-                UserProgress.user_id == current_user.id,
-                UserProgress.content_node_id == block_uuid
-            )
+            insert(UserProgress)
+            .from_select(["user_id", "content_node_id"], block_select)
+            .on_conflict_do_nothing(index_elements=["user_id", "content_node_id"])
+            .returning(UserProgress.mastered_at)
         )
-        existing = result.scalar_one_or_none()
+        mastered_at = result.scalar_one_or_none()
         
-        if existing:
+        if mastered_at is None:
+            result = await db.execute(
+                select(UserProgress.mastered_at).where(
+                    UserProgress.user_id == current_user.id,
+                    UserProgress.content_node_id == block_uuid
+                )
+            )
+            existing = result.scalar_one_or_none()
+            
+            if existing is None:
+                raise HTTPException(status_code=404, detail="Block not found")
+            
             return {
                 "message": "Block already mastered",
-                "mastered_at": existing.mastered_at.isoformat()
+                "mastered_at": existing.isoformat()
             }
         
-        # Create progress record
-        progress = UserProgress(
-            user_id=current_user.id,
-            content_node_id=block_uuid
-        )
-        db.add(progress)
         await db.commit()
-        await db.refresh(progress)
         
         return {
             "message": "Block marked as mastered",
-            "mastered_at": progress.mastered_at.isoformat()
+            "mastered_at": mastered_at.isoformat()
         }
+    except HTTPException:
+        raise
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid block ID format")
     except Exception as e:
@@ -122,26 +141,25 @@ async def mark_path_mastered(
     try:
         path_uuid = uuid.UUID(path_id)
         
-        # Check if path exists and get its blocks
+        # Check if path exists and get its blocks in a single round-trip
         result = await db.execute(
-            select(ContentNode).where(
-                ContentNode.id == path_uuid,
-                ContentNode.level == NodeLevel.PATH
+            select(ContentNode.id, ContentNode.level).where(
+                or_(
+                    ContentNode.id == path_uuid,
+                    ContentNode.parent_id == path_uuid
+                )
             )
         )
-        path = result.scalar_one_or_none()
+        rows = result.all()
         
-        if not path:
+        path_row = next(
+            (r for r in rows if r.id == path_uuid and r.level == NodeLevel.PATH),
+            None
+        )
+        if not path_row:
             raise HTTPException(status_code=404, detail="Path not found")
         
-        # Get all blocks in this path
-        blocks_result = await db.execute(
-            select(ContentNode).where(
-                ContentNode.parent_id == path_uuid,
-                ContentNode.level == NodeLevel.BLOCK
-            )
-        )
-        blocks = blocks_result.scalars().all()
+        block_ids = [r.id for r in rows if r.level == NodeLevel.BLOCK]
         
         # Mark the path itself
         path_progress = await db.execute(
@@ -159,17 +177,17 @@ async def mark_path_mastered(
         
         # Mark all blocks in the path
         mastered_count = 0
-        for block in blocks:
+        for block_id in block_ids:
             block_progress = await db.execute(
                 select(UserProgress).where(
                     UserProgress.user_id == current_user.id,
-                    UserProgress.content_node_id == block.id
+                    UserProgress.content_node_id == block_id
                 )
             )
             if not block_progress.scalar_one_or_none():
                 progress = UserProgress(
                     user_id=current_user.id,
-                    content_node_id=block.id
+                    content_node_id=block_id
                 )
                 db.add(progress)
                 mastered_count += 1
@@ -178,7 +196,7 @@ async def mark_path_mastered(
         
         return {
             "message": f"Path and {mastered_count} blocks marked as mastered",
-            "total_blocks": len(blocks),
+            "total_blocks": len(block_ids),
             "newly_mastered": mastered_count
         }
     except ValueError:
@@ -190,10 +208,25 @@ async def mark_path_mastered(
 
 @router.get("/users/me/progress", response_model=List[ProgressResponse])
 async def get_user_progress(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all mastered items for the current user"""
+    # Cheap aggregate first so unchanged progress lists answer 304 without loading rows
+    result = await db.execute(
+        select(func.max(UserProgress.mastered_at), func.count()).where(
+            UserProgress.user_id == current_user.id
+        )
+    )
+    last_mastered_at, count = result.one()
+    stamp = last_mastered_at.timestamp() if last_mastered_at else 0
+    etag = f'W/"{stamp}-{count}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
     result = await db.execute(
         select(UserProgress).where(UserProgress.user_id == current_user.id)
     )
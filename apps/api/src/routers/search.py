@@ -1,15 +1,39 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query, Depends, status
+import asyncio
+import hashlib
+import logging
+from typing import Dict, List, Optional
+from cachetools import TTLCache
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Depends, status
 from pydantic import BaseModel
+from sqlalchemy import literal_column
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import AsyncSessionLocal, get_db
 from ..dependencies import require_role
 from ..services.search import get_client, ensure_index_bootstrapped, INDEX_NAME, reindex_all
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# Short TTL: popular queries are served from memory, edits show up within a minute
+SEARCH_CACHE_TTL = 60
+SEARCH_CACHE_MAXSIZE = 2048
+
+# Bounded so unique queries cannot grow process memory; expired entries are
+# evicted on access and oldest entries once the cache is full
+_search_cache: TTLCache = TTLCache(maxsize=SEARCH_CACHE_MAXSIZE, ttl=SEARCH_CACHE_TTL)
+_search_locks: Dict[str, asyncio.Lock] = {}
+_search_waiters: Dict[str, int] = {}
+
+# Must stay identical to the ix_content_nodes_fts index expression so the
+# PostgreSQL planner can use the index for the database fallback
+FTS_DOCUMENT = literal_column(
+    "to_tsvector('simple', coalesce(content_nodes.title, '') || ' ' || "
+    "coalesce(content_nodes.content, ''))"
+)
+
 
 class SearchHit(BaseModel):
     id: str
@@ -27,6 +51,11 @@ class SearchResponse(BaseModel):
     hits: List[SearchHit]
 
 
+def _search_cache_key(q: str, limit: int, offset: int, level: Optional[str]) -> str:
+    digest = hashlib.blake2b(q.encode(), digest_size=12).hexdigest()
+    return f"v1:search:{level or '-'}:{limit}:{offset}:{digest}"
+
+
 @router.get("/search", response_model=SearchResponse)
 async def search(
     q: str = Query(..., min_length=1, description="Search query"),
@@ -36,6 +65,39 @@ async def search(
     db: AsyncSession = Depends(get_db),
 ) -> SearchResponse:
     """Search for blocks and paths. Falls back to DB search if Meilisearch is unavailable."""
+    key = _search_cache_key(q, limit, offset, level)
+    cached_response = _search_cache.get(key)
+    if cached_response is not None:
+        return cached_response
+
+    # Coalesce concurrent misses for the same query into a single backend search
+    lock = _search_locks.setdefault(key, asyncio.Lock())
+    _search_waiters[key] = _search_waiters.get(key, 0) + 1
+    try:
+        async with lock:
+            cached_response = _search_cache.get(key)
+            if cached_response is not None:
+                return cached_response
+
+            response = await _search_backend(q, limit, offset, level, db)
+            _search_cache[key] = response
+            return response
+    finally:
+        # Only drop the lock once nobody is queued on it, otherwise a new
+        # arrival would create a second lock and run a duplicate search
+        _search_waiters[key] -= 1
+        if not _search_waiters[key]:
+            del _search_waiters[key]
+            _search_locks.pop(key, None)
+
+
+async def _search_backend(
+    q: str,
+    limit: int,
+    offset: int,
+    level: Optional[str],
+    db: AsyncSession,
+) -> SearchResponse:
     try:
         ensure_index_bootstrapped()
         client = get_client()
@@ -88,15 +150,31 @@ async def search(
         )
     except Exception as e:
         # Fallback to database search if Meilisearch is unavailable
-        from sqlalchemy import select, or_
+        from sqlalchemy import select, or_, func
         from ..models import ContentNode
         
-        query_obj = select(ContentNode).where(
-            ContentNode.is_published == True,
-            or_(
-                ContentNode.title.ilike(f"%{q}%"),
-                ContentNode.content.ilike(f"%{q}%")
+        if db.get_bind().dialect.name == "postgresql":
+            # Served by the ix_content_nodes_fts GIN index
+            match = FTS_DOCUMENT.op("@@")(func.plainto_tsquery("simple", q))
+        else:
+            # Escape LIKE wildcards so a "%" or "_" in q matches literally
+            escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            pattern = f"%{escaped}%"
+            match = or_(
+                ContentNode.title.ilike(pattern, escape="\\"),
+                ContentNode.content.ilike(pattern, escape="\\")
             )
+        
+        query_obj = select(
+            ContentNode.id,
+            ContentNode.title,
+            ContentNode.slug,
+            ContentNode.level,
+            func.substr(ContentNode.content, 1, 200).label("snippet"),
+            func.count().over().label("total"),
+        ).where(
+            ContentNode.is_published == True,
+            match
         )
         
         if level:
@@ -105,37 +183,48 @@ async def search(
         
         query_obj = query_obj.offset(offset).limit(limit)
         result = await db.execute(query_obj)
-        nodes = result.scalars().all()
+        rows = result.all()
         
         hits = [
             SearchHit(
-                id=str(node.id),
-                title=node.title,
-                slug=node.slug,
-                level=node.level.value,
-                snippet=node.content[:200] if node.content else None
+                id=str(row.id),
+                title=row.title,
+                slug=row.slug,
+                level=row.level.value,
+                snippet=row.snippet or None
             )
-            for node in nodes
+            for row in rows
         ]
         
         return SearchResponse(
             query=q,
             limit=limit,
             offset=offset,
-            total=len(hits),
+            total=rows[0].total if rows else 0,
             hits=hits,
         )
 
 
+async def _reindex_in_background() -> None:
+    """Rebuild the index with a session of its own; the request's is closed by now."""
+    async with AsyncSessionLocal() as session:
+        try:
+            result = await reindex_all(session)
+            logger.info("Search reindex finished: %s documents", result.get("indexed", 0))
+        except Exception:
+            logger.exception("Search reindex failed")
+
+
 @router.post("/search/reindex", status_code=status.HTTP_202_ACCEPTED)
 async def reindex(
+    background_tasks: BackgroundTasks,
     _: object = Depends(require_role("admin")),
-    db: AsyncSession = Depends(get_db),
 ):
-    """Admin-only endpoint to rebuild the Meilisearch index from DB."""
+    """Admin-only endpoint to rebuild the Meilisearch index from DB in the background."""
     try:
         ensure_index_bootstrapped()
-        result = await reindex_all(db)
-        return {"status": "ok", "indexed": result.get("indexed", 0)}
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Reindex failed: {e}")
+
+    background_tasks.add_task(_reindex_in_background)
+    return {"status": "accepted"}
@@ -1,11 +1,15 @@
 from datetime import timedelta
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, literal, update, func, cast, case, JSON, String
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 from pydantic import BaseModel, ConfigDict
+import json
 import uuid
 
 from ..database import get_db
@@ -18,6 +22,27 @@ from ..events.events import UserRegistered
 
 router = APIRouter(prefix="/users")
 
+# Token lifetime is fixed by settings at startup
+ACCESS_TOKEN_EXPIRES = timedelta(minutes=jwt_manager.access_token_expire_minutes)
+
+# Role -> wire string, a dict lookup instead of an Enum.value access per row
+_ROLE_STR = {r: r.value for r in UserRole}
+
+# Columns UserResponse serializes; loading only these skips hashed_password etc.
+USER_RESPONSE_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.full_name,
+    User.role,
+    User.is_active,
+    User.is_verified,
+    User.xp,
+    User.level,
+    User.meta_json,
+    User.created_at,
+)
+
 
 class UserCreate(BaseModel):
     username: str
@@ -41,6 +66,23 @@ class UserResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @classmethod
+    def from_user(cls, u: User) -> "UserResponse":
+        """Build from a trusted ORM row without re-running validation"""
+        return cls.model_construct(
+            id=str(u.id),
+            username=u.username,
+            email=u.email,
+            full_name=u.full_name,
+            role=_ROLE_STR[u.role],
+            is_active=bool(u.is_active),
+            is_verified=bool(u.is_verified),
+            xp=int(u.xp),
+            level=int(u.level),
+            metadata=u.metadata,
+            created_at=u.created_at.isoformat() if u.created_at else None,
+        )
+
 
 class UserLogin(BaseModel):
     username: str
@@ -58,22 +100,7 @@ class TokenData(BaseModel):
 
 @router.post("/register", response_model=UserResponse, status_code=201)
 async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
-    # Check if user already exists
-    existing_user = await auth_manager.get_user_by_username(db, user_data.username)
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered"
-        )
-
-    existing_email = await auth_manager.get_user_by_email(db, user_data.email)
-    if existing_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-
-    # Create user
+    # Create user; the database's unique constraints reject duplicates
     try:
         user = await auth_manager.create_user(
             db=db,
@@ -93,17 +120,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     # Publish event
     await bus.publish(UserRegistered(user_id=user.id, username=user.username, email=user.email))
 
-    return UserResponse(
-        id=str(user.id),
-        username=user.username,
-        email=user.email,
-        full_name=user.full_name,
-        role=user.role.value,
-        is_active=bool(user.is_active),
-        is_verified=bool(user.is_verified),
-        xp=int(user.xp),
-        level=int(user.level),
-    )
+    return UserResponse.from_user(user)
 
 
 @router.post("/login", response_model=Token)
@@ -116,119 +133,98 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token_expires = timedelta(minutes=jwt_manager.access_token_expire_minutes)
     access_token = jwt_manager.create_access_token(
         data={
             "sub": user.username,
             "id": str(user.id),
-            "email": user.email,
-            "full_name": user.full_name,
-            "is_active": bool(user.is_active),
-            "is_verified": bool(user.is_verified),
-            "xp": int(user.xp),
-            "level": int(user.level),
+            "role": _ROLE_STR[user.role],
         },
-        expires_delta=access_token_expires,
+        expires_delta=ACCESS_TOKEN_EXPIRES,
     )
 
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_active_user)):
-    return UserResponse(
-        id=str(current_user.id),
-        username=current_user.username,
-        email=current_user.email,
-        full_name=current_user.full_name,
-        role=current_user.role.value,
-        is_active=bool(current_user.is_active),
-        is_verified=bool(current_user.is_verified),
-        xp=int(current_user.xp),
-        level=int(current_user.level),
-        metadata=current_user.metadata,
-        created_at=current_user.created_at.isoformat() if current_user.created_at else None,
-    )
-
-
-# List users at /v1/users/ (with slash)
-@router.get("/", response_model=List[UserResponse])
-async def read_users(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+async def read_users_me(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user)
 ):
-    # Only admin users can view all users
-    if current_user.role != UserRole.ADMIN:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    etag = f'W/"{current_user.updated_at.timestamp()}-{current_user.xp}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
 
-    result = await db.execute(select(User).offset(skip).limit(limit))
-    users = result.scalars().all()
-    return [
-        UserResponse(
-            id=str(u.id),
-            username=u.username,
-            email=u.email,
-            full_name=u.full_name,
-            role=u.role.value,
-            is_active=bool(u.is_active),
-            is_verified=bool(u.is_verified),
-            xp=int(u.xp),
-            level=int(u.level),
-        )
-        for u in users
-    ]
+    return UserResponse.from_user(current_user)
+
+
+# read_users returns a pre-built ORJSONResponse; `responses` keeps the OpenAPI schema
+_READ_USERS_RESPONSES = {200: {"model": List[UserResponse]}}
 
-# List users at /v1/users (without slash) to avoid 307 redirect in tests
-@router.get("", response_model=List[UserResponse])
-async def read_users_noslash(
+
+# List users at /v1/users/ and /v1/users (no slash, avoids a 307 redirect)
+@router.get("/", response_class=ORJSONResponse, responses=_READ_USERS_RESPONSES)
+@router.get("", response_class=ORJSONResponse, responses=_READ_USERS_RESPONSES, include_in_schema=False)
+async def read_users(
     skip: int = 0,
     limit: int = 100,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_role("admin"))
 ):
-    return await read_users(skip=skip, limit=limit, db=db, current_user=current_user)
+    # Select only the serialized columns; skips ORM object construction per row
+    result = await db.execute(
+        select(*USER_RESPONSE_COLUMNS).offset(skip).limit(limit)
+    )
+    # Rows are trusted DB data: build plain dicts and encode them with orjson,
+    # returning the response directly so FastAPI skips re-validating the list
+    return ORJSONResponse([
+        {
+            "id": str(u.id),
+            "username": u.username,
+            "email": u.email,
+            "full_name": u.full_name,
+            "role": _ROLE_STR[u.role],
+            "is_active": bool(u.is_active),
+            "is_verified": bool(u.is_verified),
+            "xp": int(u.xp),
+            "level": int(u.level),
+            "metadata": u.meta_json,
+            "created_at": u.created_at.isoformat() if u.created_at else None,
+        }
+        for u in result.all()
+    ])
 
 
 # Get user by ID at /v1/users/{user_id}
 @router.get("/{user_id}", response_model=UserResponse)
 async def read_user(
-    user_id: str,
+    user_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     # Users can view their own profile, admins can view any profile
-    if str(current_user.id) != user_id and current_user.role != UserRole.ADMIN:
+    if current_user.id != user_id and current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
 
-    try:
-        user_uuid = uuid.UUID(user_id)
-        result = await db.execute(select(User).where(User.id == user_uuid))
+    # The dependency already loaded the requester; only query for other users
+    if user_id == current_user.id:
+        user = current_user
+    else:
+        result = await db.execute(
+            select(User)
+            .options(load_only(*USER_RESPONSE_COLUMNS))
+            .where(User.id == user_id)
+        )
         user = result.scalar_one_or_none()
 
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        return UserResponse(
-            id=str(user.id),
-            username=user.username,
-            email=user.email,
-            full_name=user.full_name,
-            role=user.role.value,
-            is_active=bool(user.is_active),
-            is_verified=bool(user.is_verified),
-            xp=int(user.xp),
-            level=int(user.level),
-        )
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid user ID format")
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return UserResponse.from_user(user)
 
 
 class UserUpdate(BaseModel):
@@ -259,28 +255,23 @@ async def update_me(
     
     if update.email is not None:
         # Check if email is already taken by another user
-        existing_user = await auth_manager.get_user_by_email(db, update.email)
-        if existing_user and existing_user.id != current_user.id:
+        result = await db.execute(
+            select(literal(1)).where(
+                User.email == update.email,
+                User.id != current_user.id
+            ).limit(1)
+        )
+        if result.scalar() is not None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already in use"
             )
         current_user.email = update.email
     
+    # Sessions use expire_on_commit=False, so the in-memory row is already current
     await db.commit()
-    await db.refresh(current_user)
     
-    return UserResponse(
-        id=str(current_user.id),
-        username=current_user.username,
-        email=current_user.email,
-        full_name=current_user.full_name,
-        role=current_user.role.value,
-        is_active=bool(current_user.is_active),
-        is_verified=bool(current_user.is_verified),
-        xp=int(current_user.xp),
-        level=int(current_user.level),
-    )
+    return UserResponse.from_user(current_user)
 
 
 @router.post("/me/password")
@@ -291,19 +282,37 @@ async def change_password(
 ):
     """Change current user's password"""
     # Verify current password
-    if not auth_manager.verify_password(password_data.current_password, current_user.hashed_password):
+    if not await auth_manager.verify_password_async(password_data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
     # Update password
-    current_user.hashed_password = auth_manager.get_password_hash(password_data.new_password)
+    current_user.hashed_password = await auth_manager.get_password_hash_async(password_data.new_password)
     await db.commit()
     
     return {"message": "Password changed successfully"}
 
 
+def _merge_metadata(db: AsyncSession, patch: dict):
+    """SQL expression merging ``patch`` into users.metadata, treating non-objects as {}"""
+    if db.get_bind().dialect.name == "postgresql":
+        # The column is JSON, so merge as JSONB (||) and cast back
+        stored = cast(User.meta_json, JSONB)
+        base = case(
+            (func.jsonb_typeof(stored) == "object", stored),
+            else_=cast({}, JSONB),
+        )
+        return cast(base.op("||")(cast(patch, JSONB)), JSON)
+    # SQLite: json_patch() applies an RFC 7396 merge patch
+    return func.json_patch(
+        func.coalesce(User.meta_json, literal("{}", String)),
+        literal(json.dumps(patch), String),
+        type_=JSON,
+    )
+
+
 @router.patch("/me/preferences")
 async def update_preferences(
     preferences: UserPreferences,
@@ -311,17 +320,20 @@ async def update_preferences(
     db: AsyncSession = Depends(get_db)
 ):
     """Update current user's preferences"""
-    # Get existing metadata or create new
-    metadata = current_user.metadata or {}
-    
-    if preferences.emailNotifications is not None:
-        metadata['emailNotifications'] = preferences.emailNotifications
-    if preferences.publicProfile is not None:
-        metadata['publicProfile'] = preferences.publicProfile
-    if preferences.language is not None:
-        metadata['language'] = preferences.language
+    patch = preferences.model_dump(exclude_none=True)
+    if not patch:
+        return {"message": "Preferences saved successfully", "metadata": current_user.metadata or {}}
     
-    current_user.metadata = metadata
+    # Merge the changed keys into the stored document in the database instead
+    # of loading, mutating and rewriting the whole metadata blob
+    result = await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(meta_json=_merge_metadata(db, patch))
+        .returning(User.meta_json)
+        .execution_options(synchronize_session=False)
+    )
+    metadata = result.scalar_one()
     await db.commit()
     
     return {"message": "Preferences saved successfully", "metadata": metadata}
@@ -333,23 +345,19 @@ class RoleUpdate(BaseModel):
 
 @router.put("/{user_id}/role")
 async def update_user_role(
-    user_id: str,
+    user_id: uuid.UUID,
     update: RoleUpdate,
     db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(require_role("admin")),
 ):
     """Admin-only: assign a role to a user (e.g., 'moderator')."""
-    try:
-        user_uuid = uuid.UUID(user_id)
-        result = await db.execute(select(User).where(User.id == user_uuid))
-        user = result.scalar_one_or_none()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
 
-        ok = await rbac_manager.assign_role(db, user, update.role)
-        if not ok:
-            raise HTTPException(status_code=400, detail="Invalid role specified")
+    ok = await rbac_manager.assign_role(db, user, update.role)
+    if not ok:
+        raise HTTPException(status_code=400, detail="Invalid role specified")
 
-        return {"id": str(user.id), "role": user.role.value}
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid user ID format")
+    return {"id": str(user.id), "role": _ROLE_STR[user.role]}
@@ -1,76 +1,163 @@
 """
 WebSocket router for real-time updates.
 """
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Query, status
+from cachetools import TLRUCache
+import hashlib
 import logging
-import json
+import time
+import uuid
+import orjson
 
-from src.websocket.connection_manager import get_connection_manager
-from src.dependencies import get_db
-from src.models import User
+from src.auth import jwt_manager
+from src.websocket.connection_manager import get_connection_manager, negotiate_subprotocol
 
 router = APIRouter(tags=["WebSocket"])
 logger = logging.getLogger(__name__)
 
+# Process-wide singleton, resolved once instead of on every connection
+_MANAGER = get_connection_manager()
+
+# Verified token payloads, so reconnect storms don't redo signature checks
+TOKEN_CACHE_TTL = 5
+TOKEN_CACHE_MAXSIZE = 10_000
+
+
+def _token_expires_at(key: str, payload: dict, now: float) -> float:
+    """Expire cached payloads after TOKEN_CACHE_TTL or at the token's own exp."""
+    return min(now + TOKEN_CACHE_TTL, payload.get("exp", float("inf")))
+
+
+_token_cache: TLRUCache = TLRUCache(
+    maxsize=TOKEN_CACHE_MAXSIZE, ttu=_token_expires_at, timer=time.time
+)
+
+
+def _verify_token_cached(token: str) -> Optional[dict]:
+    """Verify a JWT, reusing a recent verification of the same token."""
+    # Key by digest so raw tokens are not kept in memory
+    key = hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = jwt_manager.verify_token(token)
+    if payload:
+        # Already-expired payloads are dropped by the cache itself
+        _token_cache[key] = payload
+    return payload
+
+
+async def _send(websocket: WebSocket, payload: dict) -> None:
+    """Send a JSON payload encoded with orjson.
+
+    Sent as a text frame: the web client JSON.parses event.data, which would
+    be a Blob for a binary send_bytes frame. Connections that negotiated
+    MessagePack get a binary frame from the connection manager instead.
+    """
+    if websocket in _MANAGER.msgpack_connections:
+        await _MANAGER.send(websocket, payload)
+        return
+    await websocket.send_text(orjson.dumps(payload).decode())
+
+
+async def _handle_ping(websocket: WebSocket, message: dict) -> None:
+    await _send(websocket, {
+        "type": "pong",
+        "timestamp": message.get("timestamp")
+    })
+
+
+async def _handle_subscribe(websocket: WebSocket, message: dict) -> None:
+    # Subscribe to specific channels
+    channel = message.get("channel")
+    await _send(websocket, {
+        "type": "subscribed",
+        "channel": channel,
+        "message": f"Subscribed to {channel}"
+    })
+
+
+async def _handle_unsubscribe(websocket: WebSocket, message: dict) -> None:
+    # Unsubscribe from channels
+    channel = message.get("channel")
+    await _send(websocket, {
+        "type": "unsubscribed",
+        "channel": channel,
+        "message": f"Unsubscribed from {channel}"
+    })
+
+
+# Constant parts of the welcome message, encoded once; only user_id varies
+_WELCOME_PREFIX = '{"type":"connection","status":"connected","user_id":'
+_WELCOME_SUFFIX = ',"message":"WebSocket connection established"}'
+
+# Client message type -> handler
+HANDLERS = {
+    "ping": _handle_ping,
+    "subscribe": _handle_subscribe,
+    "unsubscribe": _handle_unsubscribe,
+}
+
+
+@dataclass
+class WebSocketUser:
+    """Connection identity built from verified JWT claims, without a DB lookup."""
+    id: uuid.UUID
+    username: str
+    role: Optional[str] = None
+    is_active: bool = True
+
 
 async def get_current_user_ws(
     token: str = Query(...),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+) -> WebSocketUser:
     """
     Get current user from WebSocket token parameter with proper JWT validation.
     
+    The handshake is served from the token claims alone, without a DB lookup.
+    
     Args:
         token: JWT token from query parameter
-        db: Database session
     
     Returns:
-        User object
+        WebSocketUser built from the token claims
     
     Raises:
         HTTPException: If authentication fails
     """
-    from src.auth import jwt_manager
-    from fastapi import HTTPException, status
-    
     try:
         # Verify JWT token
-        payload = jwt_manager.verify_token(token)
+        payload = _verify_token_cached(token)
         if not payload:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid or expired token"
             )
         
-        # Extract user ID from payload
-        user_id = payload.get("sub")
-        if not user_id:
+        # Extract user identity from payload
+        user_id = payload.get("id")
+        username = payload.get("sub")
+        if not user_id or not username:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token payload"
             )
         
-        # Load user from database
-        result = await db.execute(
-            select(User).filter(User.id == user_id)
-        )
-        user = result.scalar_one_or_none()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
-        
-        if not user.is_active:
+        # Tokens are only issued to active users; honour an explicit claim if present
+        if not payload.get("is_active", True):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User account is inactive"
             )
         
-        return user
+        return WebSocketUser(
+            id=uuid.UUID(user_id),
+            username=username,
+            role=payload.get("role"),
+        )
         
     except HTTPException:
         raise
@@ -86,15 +173,17 @@ async def get_current_user_ws(
 async def websocket_endpoint(
     websocket: WebSocket,
     token: str = Query(None),
-    db: AsyncSession = Depends(get_db)
 ):
     """
     Main WebSocket endpoint for real-time updates.
     
+    No DB session is held for the connection's lifetime; a handler that needs
+    the database should open a short-lived ``AsyncSessionLocal()`` session.
+    
     Query params:
         token: JWT authentication token
     """
-    manager = get_connection_manager()
+    manager = _MANAGER
     user_id = None
     
     try:
@@ -102,72 +191,55 @@ async def websocket_endpoint(
         # In production, always require authentication
         if token:
             # Decode JWT token to get user info
-            from src.auth import jwt_manager
-            try:
-                payload = jwt_manager.decode_access_token(token)
-                user_id = str(payload.get("id"))  # Get user ID from token and convert to string
+            payload = _verify_token_cached(token)
+            if payload and payload.get("id"):
+                user_id = str(payload["id"])  # Get user ID from token and convert to string
                 logger.info(f"WebSocket authenticated for user {user_id}")
-            except Exception as e:
-                logger.error(f"WebSocket auth error: {e}")
-                user_id = "demo-user"  # Fallback for development
+            else:
+                logger.warning("WebSocket auth error: invalid or expired token")
+                # Fallback for development: a unique guest id, so failed auths
+                # don't all pile onto one shared connection-manager key
+                user_id = f"guest-{str(uuid.uuid4())[:8]}"
         else:
             # Demo mode - generate temporary user ID
-            import uuid
             user_id = f"guest-{str(uuid.uuid4())[:8]}"
         
-        await manager.connect(websocket, user_id)
+        # Clients offering the "msgpack" subprotocol get binary MessagePack frames
+        subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols", []))
+        await manager.connect(websocket, user_id, subprotocol)
         
-        # Send welcome message
-        await websocket.send_json({
-            "type": "connection",
-            "status": "connected",
-            "user_id": user_id,
-            "message": "WebSocket connection established"
-        })
+        # Send welcome message (user_id is still JSON-escaped, it comes from a token claim)
+        if subprotocol:
+            await _send(websocket, {
+                "type": "connection",
+                "status": "connected",
+                "user_id": user_id,
+                "message": "WebSocket connection established"
+            })
+        else:
+            await websocket.send_text(
+                _WELCOME_PREFIX + orjson.dumps(user_id).decode() + _WELCOME_SUFFIX
+            )
         
-        # Listen for messages from client
+        # Listen for messages from client; a disconnect raises out of
+        # receive_text() to the WebSocketDisconnect handler below
         while True:
+            data = await websocket.receive_text()
             try:
-                data = await websocket.receive_text()
-                message = json.loads(data)
-                
-                # Handle different message types
-                if message.get("type") == "ping":
-                    await websocket.send_json({
-                        "type": "pong",
-                        "timestamp": message.get("timestamp")
-                    })
-                
-                elif message.get("type") == "subscribe":
-                    # Subscribe to specific channels
-                    channel = message.get("channel")
-                    await websocket.send_json({
-                        "type": "subscribed",
-                        "channel": channel,
-                        "message": f"Subscribed to {channel}"
-                    })
-                
-                elif message.get("type") == "unsubscribe":
-                    # Unsubscribe from channels
-                    channel = message.get("channel")
-                    await websocket.send_json({
-                        "type": "unsubscribed",
-                        "channel": channel,
-                        "message": f"Unsubscribed from {channel}"
-                    })
-                
-                else:
-                    logger.warning(f"Unknown message type: {message.get('type')}")
-            
-            except json.JSONDecodeError:
-                await websocket.send_json({
+                message = orjson.loads(data)
+            except orjson.JSONDecodeError:
+                await _send(websocket, {
                     "type": "error",
                     "message": "Invalid JSON"
                 })
+                continue
             
-            except Exception as e:
-                logger.error(f"Error processing message: {e}")
-                break
+            message_type = message.get("type") if isinstance(message, dict) else None
+            handler = HANDLERS.get(message_type)
+            if handler:
+                await handler(websocket, message)
+            else:
+                logger.warning(f"Unknown message type: {message_type}")
     
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for user {user_id}")
@@ -183,7 +255,7 @@ async def websocket_endpoint(
 @router.get("/ws/stats")
 async def websocket_stats():
     """Get WebSocket connection statistics."""
-    manager = get_connection_manager()
+    manager = _MANAGER
     
     return {
         "total_connections": manager.get_connection_count(),
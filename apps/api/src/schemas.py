@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
@@ -51,8 +51,7 @@ class BlockPublic(BaseModel):
     created_by_id: Optional[str] = None
     metadata: Optional[dict] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 
 class SuggestionCreate(BaseModel):
@@ -71,8 +70,7 @@ class SuggestionResponse(BaseModel):
     created_at: datetime
     created_by_id: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 
 class PathCreate(BaseModel):
@@ -93,5 +91,4 @@ class PathPublic(BaseModel):
     created_by_id: Optional[str] = None
     metadata: Optional[dict] = None
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
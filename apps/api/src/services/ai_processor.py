@@ -2,23 +2,236 @@
 AI job processor for background task execution.
 """
 import asyncio
-import json
+import contextlib
+import functools
+import operator
+import logging
 import os
-from datetime import datetime
+import re
+import weakref
+from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import Bundle
+import orjson
 import uuid
 
 from src.ai_config_models import (
+    AIAgentType,
     AIConfiguration,
     AIJob,
     AIBlockSuggestion,
     AIJobStatus,
 )
-from src.services.ai_providers import create_ai_provider
+from src.config import settings
+from src.services.ai_providers import clear_provider_cache, clear_response_cache, create_ai_provider
 from src.utils.encryption import decrypt_api_key
 
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=256)
+def _decrypt_api_key_cached(config_id: str, ciphertext: str) -> str:
+    """Decrypt a configuration's API key once per (config, ciphertext) pair.
+    
+    Only the plaintext is cached. A rotated key has a new ciphertext and so
+    misses; call clear_api_key_cache() to drop plaintexts on rotation/deletion.
+    """
+    return decrypt_api_key(ciphertext)
+
+
+def clear_api_key_cache() -> None:
+    """Forget all cached decrypted API keys, the providers built from them and their responses."""
+    _decrypt_api_key_cached.cache_clear()
+    clear_provider_cache()
+    clear_response_cache()
+
+
+# Content creator system prompt when the configuration doesn't set one
+_DEFAULT_SYSTEM_PROMPT = """You are a knowledge block creator. 
+Your task is to create concise, accurate, and well-structured knowledge blocks.
+First, review existing blocks to avoid duplication.
+Then create new content that fills gaps in the knowledge base."""
+
+# Fixed system prompts of the other job types
+_RESEARCHER_SYSTEM_PROMPT = "You are a research assistant. Analyze existing content and suggest improvements."
+_EDITOR_SYSTEM_PROMPT = "You are a content editor. Improve clarity, correctness, and readability while preserving the original intent."
+_COURSE_DESIGNER_SYSTEM_PROMPT = "You are a course designer. Create structured learning paths from existing content."
+
+
+# Runs of anything but letters and digits become one "-" in a slug
+_SLUG_RE = re.compile(r"[\W_]+")
+
+# Source URLs cited in generated content
+_SOURCE_URL_RE = re.compile(r'https?://(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9()@:%_\+.~#?&/=]*)')
+
+
+def _prompt_json(value: Any) -> str:
+    """Serialize data embedded in an LLM prompt (compact: fewer prompt tokens)."""
+    return orjson.dumps(value).decode()
+
+
+# Bounds on what one job embeds in its prompt and keeps on the job row
+PROMPT_SUMMARY_MAX_CHARS = 200
+MAX_SUGGESTED_BLOCKS = 20
+
+# Block dict -> its id, for building suggested_blocks
+_BLOCK_ID = operator.itemgetter("id")
+
+
+def _compact_blocks(blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Project MCP block results to the fields the LLM needs, to shrink prompts."""
+    return [
+        {
+            "id": b["id"],
+            "title": b.get("title", ""),
+            "summary": (b.get("content_preview") or "")[:PROMPT_SUMMARY_MAX_CHARS],
+        }
+        for b in blocks[:MAX_SUGGESTED_BLOCKS]
+    ]
+
+
+# Updates closer together than this are sent together as one WebSocket frame
+PROGRESS_THROTTLE_SECONDS = 0.05
+
+# While streaming a generation, advance the progress bar every N chunks
+STREAM_PROGRESS_EVERY = 16
+
+
+class _JobUpdates:
+    """Buffer a job's WebSocket messages and send them in batched frames.
+    
+    At most one frame goes out per interval. Messages that arrive in between
+    are queued and sent by a single delayed flush task. A newer progress
+    message replaces a queued one, because only the latest matters. A frame
+    with several messages goes out as one ``batch`` message. A progress
+    update identical to the previous one is dropped.
+    """
+    
+    def __init__(self, ws_manager, user_id: str, job_id: str, interval: float = PROGRESS_THROTTLE_SECONDS):
+        self.ws_manager = ws_manager
+        self.user_id = user_id
+        self.job_id = job_id
+        self.interval = interval
+        self._last_sent = float("-inf")
+        self._pending: List[dict] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_progress: Optional[tuple] = None
+    
+    async def update(self, progress: float, message: str) -> None:
+        """Queue a progress update, replacing a queued one."""
+        if (progress, message) == self._last_progress or not self._listening():
+            return
+        self._last_progress = (progress, message)
+        payload = self.ws_manager.ai_job_progress_message(self.job_id, progress, message)
+        if self._pending and self._pending[-1]["type"] == "ai_job_progress":
+            self._pending[-1] = payload
+        else:
+            self._pending.append(payload)
+        await self._schedule()
+    
+    async def status(self, status: str, data: Optional[dict] = None) -> None:
+        """Queue a status update."""
+        if not self._listening():
+            return
+        self._pending.append(self.ws_manager.ai_job_update_message(self.job_id, status, data))
+        await self._schedule()
+    
+    async def finish(self, status: str, data: Optional[dict] = None) -> None:
+        """Send a terminal status update together with anything still queued."""
+        self.cancel()
+        if self._listening():
+            self._pending.append(self.ws_manager.ai_job_update_message(self.job_id, status, data))
+        await self._send_pending()
+    
+    def _listening(self) -> bool:
+        return self.ws_manager is not None and self.ws_manager.has_subscribers(self.user_id)
+    
+    async def _schedule(self) -> None:
+        """Send now if the interval has passed, otherwise schedule one flush."""
+        if self._flush_task is not None:
+            return
+        
+        wait = self._last_sent + self.interval - asyncio.get_running_loop().time()
+        if wait <= 0:
+            await self._send_pending()
+        else:
+            self._flush_task = asyncio.create_task(self._flush_later(wait))
+    
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        await self._send_pending()
+    
+    async def _send_pending(self) -> None:
+        if not self._pending:
+            return
+        messages, self._pending = self._pending, []
+        self._last_sent = asyncio.get_running_loop().time()
+        if len(messages) == 1:
+            await self.ws_manager.send_personal_message(messages[0], self.user_id)
+        else:
+            await self.ws_manager.send_batch(messages, self.user_id)
+    
+    def cancel(self) -> None:
+        """Drop the scheduled flush; queued messages are kept for finish()."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+
+# Bounds concurrent provider calls per event loop (semaphores are loop-bound)
+_llm_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+@contextlib.asynccontextmanager
+async def _llm_call():
+    """Hold one of ``settings.ai_max_concurrency`` provider-call slots.
+    
+    Jobs beyond the limit wait for a slot instead of all hitting the provider
+    at once (and its rate limits). Once started, the call must finish within
+    ``settings.ai_request_timeout`` seconds.
+    """
+    loop = asyncio.get_running_loop()
+    slots = _llm_slots.get(loop)
+    if slots is None:
+        slots = _llm_slots[loop] = asyncio.Semaphore(settings.ai_max_concurrency)
+    async with slots:
+        try:
+            async with asyncio.timeout(settings.ai_request_timeout):
+                yield
+        except TimeoutError as e:
+            raise TimeoutError(f"request timed out after {settings.ai_request_timeout:g}s") from e
+
+
+async def _generate_limited(provider, prompt: str, **params) -> Dict[str, Any]:
+    """provider.generate, within an LLM call slot."""
+    async with _llm_call():
+        return await provider.generate(prompt, **params)
+
+
+@functools.cache
+def _storage_service():
+    """Lazy load storage service (None when minio is not installed)."""
+    try:
+        from src.services.storage import get_storage_service
+        return get_storage_service()
+    except ImportError:
+        logger.warning("Storage service not available (minio not installed)")
+        return None
+
+
+@functools.cache
+def _ws_manager():
+    """Lazy load WebSocket manager."""
+    from src.websocket.connection_manager import get_connection_manager
+    return get_connection_manager()
+
+
+class UnknownJobTypeError(ValueError):
+    """Raised for an AI job whose job_type has no handler."""
+
 
 class AIJobProcessor:
     """Process AI jobs in the background."""
@@ -26,33 +239,86 @@ class AIJobProcessor:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.mcp_client = None
-        self.storage = None
-        self.ws_manager = None
+        self.progress: Optional[_JobUpdates] = None
     
-    def _get_mcp_client(self):
-        """Lazy load MCP client."""
+    async def _get_mcp_client(self):
+        """Lazy load the shared MCP client, once per processor."""
         if self.mcp_client is None:
             from src.services.mcp_client import get_mcp_client
-            return get_mcp_client()
+            self.mcp_client = await get_mcp_client()
         return self.mcp_client
     
-    def _get_storage(self):
-        """Lazy load storage service."""
-        if self.storage is None:
-            try:
-                from src.services.storage import get_storage_service
-                self.storage = get_storage_service()
-            except ImportError:
-                print("Warning: Storage service not available (minio not installed)")
-                self.storage = None
-        return self.storage
+    def _create_provider(self, config: AIConfiguration):
+        """Decrypt the API key and build the provider (CPU-bound; run in a thread)."""
+        api_key = (
+            _decrypt_api_key_cached(str(config.id), config.api_key_encrypted)
+            if config.api_key_encrypted else None
+        )
+        return create_ai_provider(
+            config.provider.value,
+            api_key or os.getenv(f"{config.provider.value.upper()}_API_KEY", ""),
+            config.model_name,
+            config.api_endpoint
+        )
+    
+    async def _get_provider(self, config: AIConfiguration):
+        """Get the provider for a configuration.
+        
+        Decryption is CPU-bound, so it runs in a worker thread; the decrypted
+        key and the provider built from it are both memoized.
+        """
+        return await asyncio.to_thread(self._create_provider, config)
     
-    def _get_ws_manager(self):
-        """Lazy load WebSocket manager."""
-        if self.ws_manager is None:
-            from src.websocket.connection_manager import get_connection_manager
-            self.ws_manager = get_connection_manager()
-        return self.ws_manager
+    async def _release_connection(self) -> None:
+        """End the session's read transaction before a long provider call.
+        
+        Only reads run between the RUNNING commit and the generation, so the
+        commit writes nothing; it returns the pooled connection instead of
+        pinning it for the seconds-to-minutes the LLM takes. The next query
+        checks a connection out again, and with expire_on_commit=False the
+        loaded job and blocks stay usable.
+        """
+        if self.db.in_transaction():
+            await self.db.commit()
+    
+    async def _generate_streamed(
+        self,
+        provider,
+        prompt: str,
+        system_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        start: float,
+        end: float,
+    ) -> Dict[str, Any]:
+        """Run a generation through provider.generate_stream, reporting progress.
+        
+        Progress moves from ``start`` on the first chunk towards ``end`` as
+        chunks arrive. Returns a dict shaped like provider.generate's result.
+        """
+        chunks: List[str] = []
+        usage: Dict[str, int] = {}
+        stream = provider.generate_stream(
+            prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            usage=usage,
+        )
+        try:
+            async with _llm_call(), contextlib.aclosing(stream):
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    if len(chunks) % STREAM_PROGRESS_EVERY == 1:
+                        progress = min(end - 1.0, start + len(chunks) // STREAM_PROGRESS_EVERY)
+                        await self.progress.update(progress, "Receiving generated content...")
+        except Exception as e:
+            raise Exception(f"AI provider error: {e}") from e
+        
+        return {
+            "content": "".join(chunks),
+            "tokens_used": usage or {"prompt": 0, "completion": 0, "total": 0},
+        }
     
     async def process_job(self, job_id: str, config_id: str) -> None:
         """
@@ -62,93 +328,104 @@ class AIJobProcessor:
             job_id: AI job ID
             config_id: AI configuration ID
         """
-        # Load job and configuration
-        job_result = await self.db.execute(
-            select(AIJob).filter(AIJob.id == job_id)
+        # Load job and configuration in one round trip. The job row is locked
+        # (FOR UPDATE OF ai_jobs SKIP LOCKED) so a concurrent worker skips it
+        # rather than waiting; SQLite has no row locks and omits the clause.
+        # The configuration is read-only here: it comes back as a plain Core
+        # row (attribute access by column name) with no ORM identity-map or
+        # unit-of-work bookkeeping; only the job needs change tracking
+        config_table = AIConfiguration.__table__
+        result = await self.db.execute(
+            select(AIJob, Bundle("config", *config_table.c))
+            .outerjoin(config_table, config_table.c.id == config_id)
+            .where(AIJob.id == job_id)
+            .with_for_update(of=AIJob, skip_locked=True)
         )
-        job = job_result.scalar_one_or_none()
+        row = result.one_or_none()
         
-        if not job:
-            print(f"Job {job_id} not found")
+        if row is None:
+            logger.info("Job %s not found or locked by another worker", job_id)
             return
         
-        config_result = await self.db.execute(
-            select(AIConfiguration).filter(AIConfiguration.id == config_id)
-        )
-        config = config_result.scalar_one_or_none()
+        job = row.AIJob
+        # Only a pending job is picked up; another worker may have started it
+        if job.status != AIJobStatus.PENDING:
+            logger.info("Job %s is %s, skipping", job_id, job.status.value)
+            await self.db.rollback()
+            return
+        
+        # The outer join yields an all-NULL bundle when the config is missing
+        config = row.config if row.config.id is not None else None
         
         if not config:
             job.status = AIJobStatus.FAILED
             job.error_message = "Configuration not found"
+            job.updated_at = datetime.now(timezone.utc)
             await self.db.commit()
             return
         
+        # RUNNING transition in one commit
+        job.status = AIJobStatus.RUNNING
+        job.started_at = datetime.now(timezone.utc)
+        job.updated_at = job.started_at
+        await self.db.commit()
+        
+        # WebSocket messages for this job, batched per frame
+        self.progress = _JobUpdates(_ws_manager(), str(job.user_id), str(job.id))
+        
         try:
-            # Update job status
-            job.status = AIJobStatus.RUNNING
-            job.started_at = {"iso": datetime.utcnow().isoformat()}
-            await self.db.commit()
-            
-            # Send WebSocket update
-            ws_manager = self._get_ws_manager()
-            if ws_manager:
-                await ws_manager.send_ai_job_update(
-                    str(job.user_id),  # Convert UUID to string
-                    str(job.id),       # Convert UUID to string
-                    AIJobStatus.RUNNING.value,
-                    {"message": "Job started"}
-                )
+            await self.progress.status(AIJobStatus.RUNNING.value, {"message": "Job started"})
             
             # Process based on job type
-            if job.job_type == "content_creator":
-                await self._process_content_creator(job, config)
-            elif job.job_type == "content_researcher":
-                await self._process_content_researcher(job, config)
-            elif job.job_type == "content_editor":
-                await self._process_content_editor(job, config)
-            elif job.job_type == "course_designer":
-                await self._process_course_designer(job, config)
-            
-            # Mark as completed
-            job.status = AIJobStatus.COMPLETED
-            job.completed_at = {"iso": datetime.utcnow().isoformat()}
-            
-            # Send completion update
-            ws_manager = self._get_ws_manager()
-            if ws_manager:
-                await ws_manager.send_ai_job_update(
-                    str(job.user_id),  # Convert UUID to string
-                    str(job.id),       # Convert UUID to string
-                    AIJobStatus.COMPLETED.value,
-                    {
-                        "message": "Job completed successfully",
-                        "output_data": job.output_data
-                    }
-                )
+            handler = _HANDLERS.get(job.job_type)
+            if handler is None:
+                raise UnknownJobTypeError(f"Unknown AI job type: {job.job_type}")
+            await handler(self, job, config)
             
         except Exception as e:
+            self.progress.cancel()
+            
+            # Drop suggestions staged by the handler; only the job row is saved
+            for pending in list(self.db.new):
+                self.db.expunge(pending)
+
+            # Terminal FAILED state: status, error and updated_at in one commit
             job.status = AIJobStatus.FAILED
             job.error_message = str(e)
-            print(f"Error processing job {job_id}: {e}")
-            import traceback
-            traceback.print_exc()
+            job.updated_at = datetime.now(timezone.utc)
+            logger.exception("Error processing job %s", job_id)
+            await self.db.commit()
             
-            # Send failure update
-            ws_manager = self._get_ws_manager()
-            if ws_manager:
-                await ws_manager.send_ai_job_update(
-                    str(job.user_id),  # Convert UUID to string
-                    str(job.id),       # Convert UUID to string
-                    AIJobStatus.FAILED.value,
-                    {
-                        "message": "Job failed",
-                        "error": str(e)
-                    }
-                )
+            # Send failure update (with any queued progress, in one frame)
+            await self.progress.finish(
+                AIJobStatus.FAILED.value,
+                {
+                    "message": "Job failed",
+                    "error": str(e)
+                }
+            )
+            return
         
-        finally:
-            job.updated_at = {"iso": datetime.utcnow().isoformat()}
-            await self.db.commit()
+        # Terminal COMPLETED state: status, completed_at, updated_at and any
+        # staged suggestion in one commit, made before notifying so clients
+        # that refetch see it
+        job.status = AIJobStatus.COMPLETED
+        job.completed_at = datetime.now(timezone.utc)
+        job.updated_at = job.completed_at
+        suggestion_count = sum(isinstance(obj, AIBlockSuggestion) for obj in self.db.new)
+        await self.db.commit()
+        
+        # Send completion update (with any queued progress, in one frame). The
+        # output itself can be many KB; clients fetch it over REST, so the
+        # frame only says how big it is
+        await self.progress.finish(
+            AIJobStatus.COMPLETED.value,
+            {
+                "message": "Job completed successfully",
+                "output_size": len(orjson.dumps(job.output_data)) if job.output_data else 0,
+                "suggestion_count": suggestion_count,
+            }
+        )
     
     async def _process_content_creator(
         self,
@@ -156,103 +433,70 @@ class AIJobProcessor:
         config: AIConfiguration
     ) -> None:
         """Process content creator job."""
-        # Initialize MCP client
-        self.mcp_client = await self._get_mcp_client()
-        ws_manager = self._get_ws_manager()
+        mcp_client = await self._get_mcp_client()
         
         # Send progress update
-        if ws_manager:
-            await ws_manager.send_ai_job_progress(
-                str(job.user_id),  # Convert UUID to string
-                str(job.id),       # Convert UUID to string
-                10.0,
-                "Searching existing blocks via MCP..."
-            )
-        
-        # Search existing blocks first via MCP
-        existing_blocks = await self.mcp_client.search_existing_blocks(
-            job.input_prompt,
-            self.db,
-            limit=5
+        await self.progress.update(10.0, "Searching existing blocks via MCP...")
+        
+        # Search existing blocks via MCP while the API key is decrypted and
+        # the provider built in a worker thread; the two are independent
+        existing_blocks, provider = await asyncio.gather(
+            mcp_client.search_existing_blocks(
+                job.input_prompt,
+                self.db,
+                limit=5
+            ),
+            self._get_provider(config)
         )
         
         # Send progress update
-        if ws_manager:
-            await ws_manager.send_ai_job_progress(
-                str(job.user_id),  # Convert UUID to string
-                str(job.id),       # Convert UUID to string
-                30.0,
-                f"Found {len(existing_blocks)} related blocks"
-            )
-        
-        # Create AI provider (decrypt API key)
-        api_key = decrypt_api_key(config.api_key_encrypted) if config.api_key_encrypted else None
-        provider = create_ai_provider(
-            config.provider.value,
-            api_key or os.getenv(f"{config.provider.value.upper()}_API_KEY", ""),
-            config.model_name,
-            config.api_endpoint
-        )
+        await self.progress.update(30.0, f"Found {len(existing_blocks)} related blocks")
         
         # Build system prompt
-        system_prompt = config.system_prompt or """You are a knowledge block creator. 
-Your task is to create concise, accurate, and well-structured knowledge blocks.
-First, review existing blocks to avoid duplication.
-Then create new content that fills gaps in the knowledge base."""
+        system_prompt = config.system_prompt or _DEFAULT_SYSTEM_PROMPT
         
         # Add existing blocks to context
         context = f"""User request: {job.input_prompt}
 
 Existing relevant blocks found:
-{json.dumps(existing_blocks, indent=2)}
+{_prompt_json(_compact_blocks(existing_blocks))}
 
 Based on these existing blocks, create new, non-duplicate content."""
         
         # Send progress update
-        if ws_manager:
-            await ws_manager.send_ai_job_progress(
-                str(job.user_id),  # Convert UUID to string
-                str(job.id),       # Convert UUID to string
-                50.0,
-                "Generating content with AI..."
-            )
+        await self.progress.update(50.0, "Generating content with AI...")
+        
+        await self._release_connection()
         
-        # Generate content
-        result = await provider.generate(
+        # Generate content, streamed so progress moves as soon as tokens arrive;
+        # provider errors are raised by the stream
+        result = await self._generate_streamed(
+            provider,
             context,
             system_prompt=system_prompt,
             temperature=config.temperature.get("value", 0.7),
-            max_tokens=config.max_tokens.get("value", 2000)
+            max_tokens=config.max_tokens.get("value", 2000),
+            start=60.0,
+            end=80.0,
         )
         
-        # Check if AI provider returned an error
-        if result.get("error"):
-            raise Exception(f"AI provider error: {result['error']}")
-        
         if not result.get("content"):
             raise Exception("AI provider returned no content")
         
         # Send progress update
-        if ws_manager:
-            await ws_manager.send_ai_job_progress(
-                str(job.user_id),  # Convert UUID to string
-                str(job.id),       # Convert UUID to string
-                80.0,
-                "Creating suggestion..."
-            )
+        await self.progress.update(80.0, "Creating suggestion...")
         
         # Update job with results (UUIDs already converted to strings by MCP client)
         job.output_data = result
         job.tokens_used = result.get("tokens_used", {})
-        job.suggested_blocks = [b["id"] for b in existing_blocks]
-        
-        # Create suggestion if content generated
-        if result.get("content"):
-            await self._create_block_suggestion(
-                job,
-                result["content"],
-                existing_blocks
-            )
+        job.suggested_blocks = list(map(_BLOCK_ID, existing_blocks[:MAX_SUGGESTED_BLOCKS]))
+        
+        # Create suggestion (empty content was rejected above)
+        await self._create_block_suggestion(
+            job,
+            result["content"],
+            existing_blocks
+        )
     
     async def _process_content_researcher(
         self,
@@ -260,34 +504,33 @@ Based on these existing blocks, create new, non-duplicate content."""
         config: AIConfiguration
     ) -> None:
         """Process content researcher job."""
-        self.mcp_client = await self._get_mcp_client()
-        
-        # Search for related content
-        related_blocks = await self.mcp_client.discover_related_content(
-            job.input_prompt,
-            self.db,
-            max_results=10
-        )
-        
-        # Create provider
-        provider = create_ai_provider(
-            config.provider.value,
-            config.api_key_encrypted,
-            config.model_name,
-            config.api_endpoint
+        mcp_client = await self._get_mcp_client()
+        
+        # Search for related content while the provider is built (API key
+        # decrypted) in a worker thread
+        related_blocks, provider = await asyncio.gather(
+            mcp_client.discover_related_content(
+                job.input_prompt,
+                self.db,
+                max_results=10
+            ),
+            self._get_provider(config)
         )
         
         # Generate research summary
         prompt = f"""Research topic: {job.input_prompt}
 
 Found relevant blocks:
-{json.dumps(related_blocks, indent=2)}
+{_prompt_json(_compact_blocks(related_blocks))}
 
 Summarize these findings and suggest what additional content is needed."""
         
-        result = await provider.generate(
+        await self._release_connection()
+        
+        result = await _generate_limited(
+            provider,
             prompt,
-            system_prompt="You are a research assistant. Analyze existing content and suggest improvements.",
+            system_prompt=_RESEARCHER_SYSTEM_PROMPT,
             temperature=config.temperature.get("value", 0.7),
             max_tokens=config.max_tokens.get("value", 2000)
         )
@@ -305,7 +548,7 @@ Summarize these findings and suggest what additional content is needed."""
             "related_blocks": related_blocks
         }
         job.tokens_used = result.get("tokens_used", {})
-        job.suggested_blocks = [b["id"] for b in related_blocks]
+        job.suggested_blocks = list(map(_BLOCK_ID, related_blocks[:MAX_SUGGESTED_BLOCKS]))
     
     async def _process_content_editor(
         self,
@@ -328,14 +571,8 @@ Summarize these findings and suggest what additional content is needed."""
         if not block:
             raise ValueError(f"Block {block_id} not found")
         
-        # Create provider
-        api_key = decrypt_api_key(config.api_key_encrypted) if config.api_key_encrypted else None
-        provider = create_ai_provider(
-            config.provider.value,
-            api_key or os.getenv(f"{config.provider.value.upper()}_API_KEY", ""),
-            config.model_name,
-            config.api_endpoint
-        )
+        # Create provider (decrypt API key), or reuse a cached one
+        provider = await self._get_provider(config)
         
         # Build editing prompt
         prompt = f"""Edit and improve the following content block:
@@ -352,9 +589,12 @@ Provide improved version that:
 - Maintains the original meaning
 - Follows the specific instructions given"""
         
-        result = await provider.generate(
+        await self._release_connection()
+        
+        result = await _generate_limited(
+            provider,
             prompt,
-            system_prompt="You are a content editor. Improve clarity, correctness, and readability while preserving the original intent.",
+            system_prompt=_EDITOR_SYSTEM_PROMPT,
             temperature=config.temperature.get("value", 0.5),  # Lower temperature for editing
             max_tokens=config.max_tokens.get("value", 2000)
         )
@@ -383,8 +623,9 @@ Provide improved version that:
         edited_content: str
     ) -> None:
         """Create edit suggestion for existing block"""
+        now = datetime.now(timezone.utc)
         suggestion = AIBlockSuggestion(
-            id=str(uuid.uuid4()),
+            id=uuid.uuid4(),
             ai_job_id=job.id,
             user_id=job.user_id,
             title=f"[EDIT] {original_block.title}",
@@ -397,12 +638,12 @@ Provide improved version that:
             confidence_score={"value": 0.85},  # Higher confidence for edits
             ai_rationale=f"Edited based on: {job.input_prompt}",
             status="pending",
-            created_at={"iso": datetime.utcnow().isoformat()},
-            updated_at={"iso": datetime.utcnow().isoformat()},
+            created_at=now,
+            updated_at=now,
         )
         
+        # Inserted by process_job's COMPLETED commit, in the same transaction
         self.db.add(suggestion)
-        await self.db.commit()
     
     async def _process_course_designer(
         self,
@@ -410,34 +651,43 @@ Provide improved version that:
         config: AIConfiguration
     ) -> None:
         """Process course designer job."""
-        self.mcp_client = await self._get_mcp_client()
+        mcp_client = await self._get_mcp_client()
         
-        # Find relevant blocks for course
-        related_blocks = await self.mcp_client.discover_related_content(
-            job.input_prompt,
-            self.db,
-            max_results=20
-        )
-        
-        # Create provider
-        provider = create_ai_provider(
-            config.provider.value,
-            config.api_key_encrypted,
-            config.model_name,
-            config.api_endpoint
-        )
+        # Find relevant blocks for course while the provider is built (API key
+        # decrypted) in a worker thread; if either fails the task group
+        # cancels the other instead of leaving it running
+        try:
+            async with asyncio.TaskGroup() as tg:
+                related_task = tg.create_task(
+                    mcp_client.discover_related_content(
+                        job.input_prompt,
+                        self.db,
+                        max_results=20
+                    )
+                )
+                provider_task = tg.create_task(
+                    self._get_provider(config)
+                )
+        except ExceptionGroup as eg:
+            # Surface the underlying error as the job's error message
+            raise eg.exceptions[0]
+        related_blocks = related_task.result()
+        provider = provider_task.result()
         
         # Generate course structure
         prompt = f"""Design a learning path for: {job.input_prompt}
 
 Available blocks:
-{json.dumps(related_blocks, indent=2)}
+{_prompt_json(_compact_blocks(related_blocks))}
 
 Create a structured course outline using these blocks and suggest any missing blocks needed."""
         
-        result = await provider.generate(
+        await self._release_connection()
+        
+        result = await _generate_limited(
+            provider,
             prompt,
-            system_prompt="You are a course designer. Create structured learning paths from existing content.",
+            system_prompt=_COURSE_DESIGNER_SYSTEM_PROMPT,
             temperature=config.temperature.get("value", 0.7),
             max_tokens=config.max_tokens.get("value", 2000)
         )
@@ -452,10 +702,10 @@ Create a structured course outline using these blocks and suggest any missing bl
         # UUIDs already converted to strings by MCP client
         job.output_data = {
             "course_outline": result.get("content"),
-            "suggested_blocks": related_blocks
+            "suggested_blocks": related_blocks[:MAX_SUGGESTED_BLOCKS]
         }
         job.tokens_used = result.get("tokens_used", {})
-        job.suggested_blocks = [b["id"] for b in related_blocks]
+        job.suggested_blocks = list(map(_BLOCK_ID, related_blocks[:MAX_SUGGESTED_BLOCKS]))
     
     async def _create_block_suggestion(
         self,
@@ -464,22 +714,24 @@ Create a structured course outline using these blocks and suggest any missing bl
         existing_blocks: List[Dict]
     ) -> None:
         """Create a block suggestion from AI output."""
-        # Parse content to extract title and body
-        lines = content.strip().split("\n")
-        title = lines[0].strip("# ").strip()
-        body = "\n".join(lines[1:]).strip()
+        # Parse content to extract title and body (split at the first newline
+        # only; no per-line list of a possibly long output)
+        head, _, body = content.strip().partition("\n")
+        title = head.strip("# ").strip()
+        body = body.strip()
         
         # Generate slug
-        slug = title.lower().replace(" ", "-")[:50]
+        slug = _SLUG_RE.sub("-", title.lower()).strip("-")[:50]
         
         # Extract source URLs from content
-        import re
-        url_pattern = r'https?://(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9()@:%_\+.~#?&/=]*)'
-        source_urls = list(set(re.findall(url_pattern, content)))[:5]  # Limit to 5 URLs
+        # One scan serves both the source list and the confidence score
+        urls = _SOURCE_URL_RE.findall(content)
+        source_urls = list(dict.fromkeys(urls))[:5]  # Unique, in order; limit to 5 URLs
         
         # Create suggestion
+        now = datetime.now(timezone.utc)
         suggestion = AIBlockSuggestion(
-            id=str(uuid.uuid4()),
+            id=uuid.uuid4(),
             ai_job_id=job.id,
             user_id=job.user_id,
             title=title,
@@ -489,22 +741,22 @@ Create a structured course outline using these blocks and suggest any missing bl
             language=job.input_metadata.get("language", "en") if job.input_metadata else "en",
             tags=job.input_metadata.get("tags", []) if job.input_metadata else [],
             source_urls=source_urls,
-            confidence_score=self._calculate_confidence_score(content, existing_blocks),
+            confidence_score=self._calculate_confidence_score(content, existing_blocks, len(urls)),
             ai_rationale=f"Created based on user request: {job.input_prompt}",
             status="pending",
-            created_at={"iso": datetime.utcnow().isoformat()},
-            updated_at={"iso": datetime.utcnow().isoformat()},
+            created_at=now,
+            updated_at=now,
         )
         
+        # Inserted by process_job's COMPLETED commit, in the same transaction
         self.db.add(suggestion)
-        await self.db.commit()
     
-    def _calculate_confidence_score(self, content: str, existing_blocks: List[Dict]) -> Dict[str, float]:
+    def _calculate_confidence_score(self, content: str, existing_blocks: List[Dict], url_count: int) -> Dict[str, float]:
         """Calculate confidence score based on content quality indicators"""
         score = 0.7  # Base score
         
         # Increase score if content has good structure
-        if len(content.split("\n")) > 3:  # Multiple paragraphs
+        if content.count("\n") >= 3:  # Multiple paragraphs
             score += 0.05
         
         if "```" in content:  # Contains code blocks
@@ -515,9 +767,7 @@ Create a structured course outline using these blocks and suggest any missing bl
             score += 0.05
         
         # Increase score if has URLs/sources
-        import re
-        urls = re.findall(r'https?://[^\s]+', content)
-        if len(urls) > 0:
+        if url_count > 0:
             score += 0.05
         
         # Penalize if content is very short (might be incomplete)
@@ -530,6 +780,15 @@ Create a structured course outline using these blocks and suggest any missing bl
         return {"value": score}
 
 
+# Job type -> AIJobProcessor handler
+_HANDLERS = {
+    AIAgentType.CONTENT_CREATOR: AIJobProcessor._process_content_creator,
+    AIAgentType.CONTENT_RESEARCHER: AIJobProcessor._process_content_researcher,
+    AIAgentType.CONTENT_EDITOR: AIJobProcessor._process_content_editor,
+    AIAgentType.COURSE_DESIGNER: AIJobProcessor._process_course_designer,
+}
+
+
 async def process_ai_job_background(
     job_id: str,
     config_id: str,
@@ -547,44 +806,22 @@ async def process_ai_job_background(
     await processor.process_job(job_id, config_id)
 
 
-def start_ai_job_background(job_id: str, config_id: str) -> None:
+async def run_ai_job(job_id: str, config_id: str) -> None:
     """
-    Synchronous wrapper to start an async AI job processing task.
-    Creates its own database session for background processing.
+    Process an AI job in its own database session on the running event loop.
+    
+    Jobs started this way share the application's loop, so concurrent jobs
+    share its LLM call slots.
     
     Args:
         job_id: AI job ID
         config_id: AI configuration ID
     """
-    import asyncio
     from src.database import AsyncSessionLocal
     
-    print(f"[AI JOB] Starting background processing for job {job_id} with config {config_id}")
-    
-    async def _process():
-        try:
-            print(f"[AI JOB] Creating database session for job {job_id}")
-            async with AsyncSessionLocal() as session:
-                print(f"[AI JOB] Calling process_ai_job_background for job {job_id}")
-                await process_ai_job_background(job_id, config_id, session)
-                print(f"[AI JOB] Successfully completed processing for job {job_id}")
-        except Exception as e:
-            print(f"[AI JOB] ERROR in _process for job {job_id}: {e}")
-            import traceback
-            traceback.print_exc()
-    
-    # Run in the current event loop or create a new one
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # If loop is already running (FastAPI context), create a task
-            print(f"[AI JOB] Creating async task for job {job_id} in running event loop")
-            asyncio.create_task(_process())
-        else:
-            # If no loop is running, run until complete
-            print(f"[AI JOB] Running job {job_id} in existing non-running loop")
-            loop.run_until_complete(_process())
-    except RuntimeError as e:
-        # No event loop, create new one
-        print(f"[AI JOB] No event loop, creating new one for job {job_id}: {e}")
-        asyncio.run(_process())
+        async with AsyncSessionLocal() as session:
+            await process_ai_job_background(job_id, config_id, session)
+    except Exception:
+        logger.exception("Error running AI job %s", job_id)
+
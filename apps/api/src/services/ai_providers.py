@@ -1,11 +1,18 @@
 """
 AI provider implementations for OpenAI, Anthropic, and custom providers.
 """
-from typing import Dict, Any, List, Optional, AsyncGenerator
+from typing import Callable, Dict, Any, List, Optional, AsyncGenerator
 from abc import ABC, abstractmethod
-import json
+from cachetools import LRUCache, TTLCache
+import functools
+import hashlib
 import os
 import asyncio
+import random
+import threading
+import time
+import weakref
+import orjson
 
 try:
     import openai
@@ -20,6 +27,87 @@ except ImportError:
     ANTHROPIC_AVAILABLE = False
 
 
+# Responses to deterministic requests (temperature at or below this), reused
+# for identical repeats instead of calling the provider again
+DETERMINISTIC_TEMPERATURE = 0.01
+RESPONSE_CACHE_TTL = 3600
+RESPONSE_CACHE_MAXSIZE = 1024
+
+_response_cache: TTLCache = TTLCache(maxsize=RESPONSE_CACHE_MAXSIZE, ttl=RESPONSE_CACHE_TTL)
+
+
+def clear_response_cache() -> None:
+    """Forget all cached provider responses."""
+    _response_cache.clear()
+
+
+def _cache_deterministic(generate):
+    """Cache a provider's generate() results for deterministic requests.
+    
+    The key is a SHA-256 digest over the provider class, its endpoint, a
+    digest of its API key, the model and every request parameter. Only successful results are cached. A
+    hit returns a copy with zero ``tokens_used``, since no tokens were spent.
+    """
+    @functools.wraps(generate)
+    async def wrapper(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        tools: Optional[List[Dict]] = None
+    ) -> Dict[str, Any]:
+        if temperature > DETERMINISTIC_TEMPERATURE:
+            return await generate(self, prompt, system_prompt, temperature, max_tokens, tools)
+        
+        key = hashlib.sha256(orjson.dumps(
+            [
+                type(self).__name__,
+                getattr(self, "base_url", None),
+                hashlib.sha256((getattr(self, "api_key", None) or "").encode()).hexdigest(),
+                self.model_name,
+                system_prompt,
+                prompt,
+                tools,
+                float(temperature),
+                max_tokens,
+            ],
+            option=orjson.OPT_SORT_KEYS,
+        )).hexdigest()
+        
+        cached = _response_cache.get(key)
+        if cached is not None:
+            return {**cached, "tokens_used": {"prompt": 0, "completion": 0, "total": 0}}
+        
+        result = await generate(self, prompt, system_prompt, temperature, max_tokens, tools)
+        if not result.get("error") and result.get("content"):
+            _response_cache[key] = dict(result)
+        return result
+    
+    return wrapper
+
+
+# generate_many: requests in flight per call, and retries of rate-limited ones
+GENERATE_MANY_CONCURRENCY = 8
+RATE_LIMIT_RETRIES = 5
+RATE_LIMIT_BACKOFF_BASE = 1.0
+RATE_LIMIT_BACKOFF_MAX = 30.0
+
+
+def _error_details(e: Exception) -> Dict[str, Any]:
+    """The exception type and HTTP status of a failed SDK call, for error results."""
+    return {"error_type": type(e).__name__, "status_code": getattr(e, "status_code", None)}
+
+
+def _is_rate_limited(result: Dict[str, Any]) -> bool:
+    """Whether a generate() result is a provider rate-limit (HTTP 429) error.
+    
+    Both SDKs raise RateLimitError for a 429; the providers record its type
+    and status code in the error result.
+    """
+    return result.get("status_code") == 429 or result.get("error_type") == "RateLimitError"
+
+
 class AIProvider(ABC):
     """Base class for AI providers."""
     
@@ -41,10 +129,198 @@ class AIProvider(ABC):
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        usage: Optional[Dict[str, int]] = None
     ) -> AsyncGenerator[str, None]:
-        """Stream completion from AI."""
+        """Stream completion from AI.
+        
+        Provider errors are raised, not yielded, so they never end up in the
+        generated text. If ``usage`` is given it is filled with the token
+        counts when the provider reports them.
+        """
         pass
+    
+    async def generate_many(
+        self,
+        prompts: List[str],
+        concurrency: int = GENERATE_MANY_CONCURRENCY,
+        **params
+    ) -> List[Any]:
+        """Generate completions for several prompts concurrently.
+        
+        At most ``concurrency`` requests are in flight. A request rejected by
+        the provider's rate limit is retried with jittered exponential backoff,
+        up to RATE_LIMIT_RETRIES attempts. Results are in prompt order; like
+        generate(), failures are error dicts, and an unexpected exception is
+        returned in its prompt's place rather than raised.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def one(prompt: str) -> Dict[str, Any]:
+            async with semaphore:
+                for attempt in range(RATE_LIMIT_RETRIES):
+                    result = await self.generate(prompt, **params)
+                    if not _is_rate_limited(result) or attempt == RATE_LIMIT_RETRIES - 1:
+                        break
+                    delay = min(RATE_LIMIT_BACKOFF_MAX, RATE_LIMIT_BACKOFF_BASE * 2 ** attempt)
+                    await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                return result
+        
+        return await asyncio.gather(*(one(prompt) for prompt in prompts), return_exceptions=True)
+
+
+@functools.lru_cache(maxsize=32)
+def _system_message(system_prompt: str) -> Dict[str, str]:
+    """The system message for a prompt, built once per distinct prompt.
+    
+    Agents reuse a handful of fixed system prompts. The shared dict is only
+    read when the request is serialized, never modified.
+    """
+    return {"role": "system", "content": system_prompt}
+
+
+@functools.lru_cache(maxsize=32)
+def _prompt_cache_body(system_prompt: Optional[str]) -> Optional[Dict[str, str]]:
+    """Extra request body asking the backend to reuse its cached system-prompt prefix.
+    
+    ``prompt_cache_key`` routes requests sharing a system prompt to the same
+    prefix (KV) cache, so the fixed prefix isn't prefilled again each call.
+    """
+    if not system_prompt:
+        return None
+    return {"prompt_cache_key": hashlib.sha256(system_prompt.encode()).hexdigest()[:32]}
+
+
+def _chat_messages(system_prompt: Optional[str], prompt: str) -> List[Dict[str, str]]:
+    """Build OpenAI-style chat messages: optional system prompt, then the user prompt."""
+    user = {"role": "user", "content": prompt}
+    return [_system_message(system_prompt), user] if system_prompt else [user]
+
+
+# Stream deltas are coalesced until this much time has passed or text piled up
+STREAM_COALESCE_SECONDS = 0.02
+STREAM_COALESCE_MAX_CHARS = 512
+
+
+async def _coalesced(deltas: AsyncGenerator[str, None]) -> AsyncGenerator[str, None]:
+    """Join consecutive text deltas into fewer, larger chunks.
+    
+    Buffered text is yielded once STREAM_COALESCE_SECONDS have passed since the
+    last yield or STREAM_COALESCE_MAX_CHARS are buffered, and at the end. The
+    deadline is checked as deltas arrive rather than with a timer: cancelling
+    a pending __anext__ on timeout would abort the provider's stream.
+    """
+    parts: List[str] = []
+    size = 0
+    last = time.monotonic()
+    async for delta in deltas:
+        parts.append(delta)
+        size += len(delta)
+        now = time.monotonic()
+        if size >= STREAM_COALESCE_MAX_CHARS or now - last >= STREAM_COALESCE_SECONDS:
+            yield "".join(parts)
+            parts.clear()
+            size = 0
+            last = now
+    if parts:
+        yield "".join(parts)
+
+
+async def _stream_chat_completion(
+    client,
+    model_name: str,
+    prompt: str,
+    system_prompt: Optional[str],
+    temperature: float,
+    max_tokens: int,
+    extra_body: Optional[Dict[str, Any]] = None
+) -> AsyncGenerator[str, None]:
+    """Yield text deltas from a streamed OpenAI-style chat completion."""
+    messages = _chat_messages(system_prompt, prompt)
+    
+    stream = await client.chat.completions.create(
+        model=model_name,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+        extra_body=extra_body
+    )
+    
+    async def deltas():
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async for text in _coalesced(deltas()):
+        yield text
+
+
+def _chat_completion_result(response) -> Dict[str, Any]:
+    """Convert an OpenAI-style chat completion to the provider result dict."""
+    # Validate response structure
+    choices = getattr(response, "choices", None)
+    if not choices:
+        return {
+            "error": "Invalid response from AI provider: no choices in response",
+            "content": None,
+            "tokens_used": {"prompt": 0, "completion": 0, "total": 0}
+        }
+    
+    # Each attribute walks a pydantic model; resolve every one once
+    choice = choices[0]
+    message = choice.message
+    usage = getattr(response, "usage", None)
+    result = {
+        "content": message.content,
+        "finish_reason": choice.finish_reason,
+        "tokens_used": {
+            "prompt": usage.prompt_tokens,
+            "completion": usage.completion_tokens,
+            "total": usage.total_tokens
+        } if usage is not None else {"prompt": 0, "completion": 0, "total": 0}
+    }
+    
+    # Handle tool calls if present
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        result["tool_calls"] = [
+            {
+                "id": tc.id,
+                "name": tc.function.name,
+                "arguments": orjson.loads(tc.function.arguments)
+            }
+            for tc in tool_calls
+        ]
+    
+    return result
+
+
+# SDK clients shared by every provider with the same SDK, endpoint and key,
+# so they share one connection pool. Per event loop: a pool is loop-bound
+SHARED_CLIENTS_MAXSIZE = 64
+_shared_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LRUCache]" = weakref.WeakKeyDictionary()
+
+
+def _shared_client(client_cls: type, api_key: str, base_url: Optional[str] = None):
+    """Get the running loop's ``client_cls`` client for an endpoint and key."""
+    loop = asyncio.get_running_loop()
+    clients = _shared_clients.get(loop)
+    if clients is None:
+        clients = _shared_clients[loop] = LRUCache(maxsize=SHARED_CLIENTS_MAXSIZE)
+    # Key by digest so raw API keys are not kept as dict keys
+    key = (client_cls, base_url, hashlib.sha256(api_key.encode()).hexdigest())
+    client = clients.get(key)
+    if client is None:
+        client = clients[key] = client_cls(api_key=api_key, base_url=base_url)
+    return client
+
+
+async def close_shared_clients() -> None:
+    """Close the running loop's shared SDK clients (on app shutdown)."""
+    clients = _shared_clients.pop(asyncio.get_running_loop(), None)
+    if clients:
+        await asyncio.gather(*(client.close() for client in clients.values()), return_exceptions=True)
 
 
 class OpenAIProvider(AIProvider):
@@ -55,13 +331,21 @@ class OpenAIProvider(AIProvider):
             raise ImportError("OpenAI package not installed. Run: pip install openai")
         
         # Support custom base URL for OpenAI-compatible APIs like AgentRouter
-        client_kwargs = {"api_key": api_key}
-        if base_url:
-            client_kwargs["base_url"] = base_url
-        
-        self.client = openai.AsyncOpenAI(**client_kwargs)
+        self.api_key = api_key
+        self.base_url = base_url or None
         self.model_name = model_name
     
+    @property
+    def client(self):
+        """The shared client for this endpoint and key, on the running loop."""
+        return _shared_client(openai.AsyncOpenAI, self.api_key, self.base_url)
+    
+    def _prompt_cache_body(self, system_prompt: Optional[str]) -> Optional[Dict[str, str]]:
+        # Only OpenAI itself is known to accept prompt_cache_key; some
+        # compatible APIs reject unknown request fields
+        return _prompt_cache_body(system_prompt) if self.base_url is None else None
+    
+    @_cache_deterministic
     async def generate(
         self,
         prompt: str,
@@ -71,12 +355,7 @@ class OpenAIProvider(AIProvider):
         tools: Optional[List[Dict]] = None
     ) -> Dict[str, Any]:
         """Generate completion from OpenAI."""
-        messages = []
-        
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        
-        messages.append({"role": "user", "content": prompt})
+        messages = _chat_messages(system_prompt, prompt)
         
         kwargs = {
             "model": self.model_name,
@@ -89,39 +368,14 @@ class OpenAIProvider(AIProvider):
             kwargs["tools"] = tools
             kwargs["tool_choice"] = "auto"
         
+        extra_body = self._prompt_cache_body(system_prompt)
+        if extra_body:
+            kwargs["extra_body"] = extra_body
+        
         try:
             response = await self.client.chat.completions.create(**kwargs)
             
-            # Validate response structure
-            if not hasattr(response, 'choices') or not response.choices:
-                return {
-                    "error": "Invalid response from AI provider: no choices in response",
-                    "content": None,
-                    "tokens_used": {"prompt": 0, "completion": 0, "total": 0}
-                }
-            
-            result = {
-                "content": response.choices[0].message.content,
-                "finish_reason": response.choices[0].finish_reason,
-                "tokens_used": {
-                    "prompt": response.usage.prompt_tokens if hasattr(response, 'usage') else 0,
-                    "completion": response.usage.completion_tokens if hasattr(response, 'usage') else 0,
-                    "total": response.usage.total_tokens if hasattr(response, 'usage') else 0
-                }
-            }
-            
-            # Handle tool calls if present
-            if hasattr(response.choices[0].message, 'tool_calls') and response.choices[0].message.tool_calls:
-                result["tool_calls"] = [
-                    {
-                        "id": tc.id,
-                        "name": tc.function.name,
-                        "arguments": json.loads(tc.function.arguments)
-                    }
-                    for tc in response.choices[0].message.tool_calls
-                ]
-            
-            return result
+            return _chat_completion_result(response)
             
         except Exception as e:
             error_msg = str(e)
@@ -135,6 +389,7 @@ class OpenAIProvider(AIProvider):
             
             return {
                 "error": error_msg,
+                **_error_details(e),
                 "content": None,
                 "tokens_used": {"prompt": 0, "completion": 0, "total": 0}
             }
@@ -144,31 +399,15 @@ class OpenAIProvider(AIProvider):
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        usage: Optional[Dict[str, int]] = None
     ) -> AsyncGenerator[str, None]:
         """Stream completion from OpenAI."""
-        messages = []
-        
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        
-        messages.append({"role": "user", "content": prompt})
-        
-        try:
-            stream = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                stream=True
-            )
-            
-            async for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
-                    
-        except Exception as e:
-            yield f"Error: {str(e)}"
+        async for text in _stream_chat_completion(
+            self.client, self.model_name, prompt, system_prompt, temperature, max_tokens,
+            self._prompt_cache_body(system_prompt)
+        ):
+            yield text
 
 
 class AnthropicProvider(AIProvider):
@@ -178,9 +417,15 @@ class AnthropicProvider(AIProvider):
         if not ANTHROPIC_AVAILABLE:
             raise ImportError("Anthropic package not installed. Run: pip install anthropic")
         
-        self.client = anthropic.AsyncAnthropic(api_key=api_key)
+        self.api_key = api_key
         self.model_name = model_name
     
+    @property
+    def client(self):
+        """The shared client for this key, on the running loop."""
+        return _shared_client(anthropic.AsyncAnthropic, self.api_key)
+    
+    @_cache_deterministic
     async def generate(
         self,
         prompt: str,
@@ -232,6 +477,7 @@ class AnthropicProvider(AIProvider):
         except Exception as e:
             return {
                 "error": str(e),
+                **_error_details(e),
                 "content": None,
                 "tokens_used": {"prompt": 0, "completion": 0, "total": 0}
             }
@@ -241,27 +487,31 @@ class AnthropicProvider(AIProvider):
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        usage: Optional[Dict[str, int]] = None
     ) -> AsyncGenerator[str, None]:
         """Stream completion from Anthropic."""
         kwargs = {
             "model": self.model_name,
             "max_tokens": max_tokens,
             "temperature": temperature,
-            "messages": [{"role": "user", "content": prompt}],
-            "stream": True
+            "messages": [{"role": "user", "content": prompt}]
         }
         
         if system_prompt:
             kwargs["system"] = system_prompt
         
-        try:
-            async with self.client.messages.stream(**kwargs) as stream:
-                async for text in stream.text_stream:
-                    yield text
-                    
-        except Exception as e:
-            yield f"Error: {str(e)}"
+        async with self.client.messages.stream(**kwargs) as stream:
+            async for text in _coalesced(stream.text_stream):
+                yield text
+            
+            if usage is not None:
+                final = await stream.get_final_message()
+                usage.update({
+                    "prompt": final.usage.input_tokens,
+                    "completion": final.usage.output_tokens,
+                    "total": final.usage.input_tokens + final.usage.output_tokens
+                })
 
 
 class CustomProvider(AIProvider):
@@ -274,16 +524,21 @@ class CustomProvider(AIProvider):
         # Use OpenAI client with custom base URL for OpenAI-compatible endpoints
         # The endpoint should be the base URL (e.g., https://agentrouter.org/v1)
         # The client will automatically append /chat/completions
-        client_kwargs = {"base_url": api_endpoint}
-        if api_key:
-            client_kwargs["api_key"] = api_key
-        else:
-            # Some local endpoints don't require API keys
-            client_kwargs["api_key"] = "not-needed"
-        
-        self.client = openai.AsyncOpenAI(**client_kwargs)
+        self.base_url = api_endpoint
+        # Some local endpoints don't require API keys
+        self.api_key = api_key or "not-needed"
         self.model_name = model_name
     
+    @property
+    def client(self):
+        """The shared client for this endpoint and key, on the running loop."""
+        return _shared_client(openai.AsyncOpenAI, self.api_key, self.base_url)
+    
+    def _prompt_cache_body(self, system_prompt: Optional[str]) -> Optional[Dict[str, str]]:
+        # Self-hosted servers (vLLM, TGI) ignore request fields they don't use
+        return _prompt_cache_body(system_prompt)
+    
+    @_cache_deterministic
     async def generate(
         self,
         prompt: str,
@@ -293,12 +548,7 @@ class CustomProvider(AIProvider):
         tools: Optional[List[Dict]] = None
     ) -> Dict[str, Any]:
         """Generate completion from OpenAI-compatible endpoint."""
-        messages = []
-        
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        
-        messages.append({"role": "user", "content": prompt})
+        messages = _chat_messages(system_prompt, prompt)
         
         kwargs = {
             "model": self.model_name,
@@ -311,39 +561,14 @@ class CustomProvider(AIProvider):
             kwargs["tools"] = tools
             kwargs["tool_choice"] = "auto"
         
+        extra_body = self._prompt_cache_body(system_prompt)
+        if extra_body:
+            kwargs["extra_body"] = extra_body
+        
         try:
             response = await self.client.chat.completions.create(**kwargs)
             
-            # Validate response structure
-            if not hasattr(response, 'choices') or not response.choices:
-                return {
-                    "error": "Invalid response from AI provider: no choices in response",
-                    "content": None,
-                    "tokens_used": {"prompt": 0, "completion": 0, "total": 0}
-                }
-            
-            result = {
-                "content": response.choices[0].message.content,
-                "finish_reason": response.choices[0].finish_reason,
-                "tokens_used": {
-                    "prompt": response.usage.prompt_tokens if hasattr(response, 'usage') else 0,
-                    "completion": response.usage.completion_tokens if hasattr(response, 'usage') else 0,
-                    "total": response.usage.total_tokens if hasattr(response, 'usage') else 0
-                }
-            }
-            
-            # Handle tool calls if present
-            if hasattr(response.choices[0].message, 'tool_calls') and response.choices[0].message.tool_calls:
-                result["tool_calls"] = [
-                    {
-                        "id": tc.id,
-                        "name": tc.function.name,
-                        "arguments": json.loads(tc.function.arguments)
-                    }
-                    for tc in response.choices[0].message.tool_calls
-                ]
-            
-            return result
+            return _chat_completion_result(response)
             
         except Exception as e:
             error_msg = str(e)
@@ -357,6 +582,7 @@ class CustomProvider(AIProvider):
             
             return {
                 "error": error_msg,
+                **_error_details(e),
                 "content": None,
                 "tokens_used": {"prompt": 0, "completion": 0, "total": 0}
             }
@@ -366,10 +592,129 @@ class CustomProvider(AIProvider):
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        usage: Optional[Dict[str, int]] = None
     ) -> AsyncGenerator[str, None]:
         """Stream completion from OpenAI Compatible endpoint."""
-        yield "Streaming not implemented for OpenAI Compatible provider"
+        async for text in _stream_chat_completion(
+            self.client, self.model_name, prompt, system_prompt, temperature, max_tokens,
+            self._prompt_cache_body(system_prompt)
+        ):
+            yield text
+
+
+def _openai_at(base_url: str) -> Callable[[str, str, Optional[str]], AIProvider]:
+    """Factory for an OpenAI-compatible provider at a fixed base URL."""
+    return lambda api_key, model_name, api_endpoint: OpenAIProvider(api_key, model_name, base_url=base_url)
+
+
+def _openai_at_or(default_url: str) -> Callable[[str, str, Optional[str]], AIProvider]:
+    """Factory for an OpenAI-compatible provider, at api_endpoint if given."""
+    return lambda api_key, model_name, api_endpoint: OpenAIProvider(api_key, model_name, base_url=api_endpoint or default_url)
+
+
+def _openai_at_endpoint(api_key: str, model_name: str, api_endpoint: Optional[str]) -> AIProvider:
+    return OpenAIProvider(api_key, model_name, base_url=api_endpoint)
+
+
+def _custom_at_endpoint(api_key: str, model_name: str, api_endpoint: Optional[str]) -> AIProvider:
+    return CustomProvider(api_endpoint, api_key, model_name)
+
+
+def _requiring_endpoint(
+    factory: Callable[[str, str, Optional[str]], AIProvider],
+    message: str
+) -> Callable[[str, str, Optional[str]], AIProvider]:
+    """Wrap a factory for a provider that only works with an explicit api_endpoint."""
+    def checked(api_key: str, model_name: str, api_endpoint: Optional[str]) -> AIProvider:
+        if not api_endpoint:
+            raise ValueError(message)
+        return _cached_factory(factory, provider_type, api_key, model_name, api_endpoint)
+    return checked
+
+
+# Provider type -> factory(api_key, model_name, api_endpoint)
+_PROVIDER_FACTORIES: Dict[str, Callable[[str, str, Optional[str]], AIProvider]] = {
+    # Native OpenAI
+    "openai": _openai_at_endpoint,
+    
+    # Native Anthropic
+    "anthropic": lambda api_key, model_name, api_endpoint: AnthropicProvider(api_key, model_name),
+    
+    # Aggregators & Routers (OpenAI-compatible)
+    "openrouter": _openai_at("https://openrouter.ai/api/v1"),
+    
+    # Ultra-Fast Inference Providers (OpenAI-compatible)
+    "groq": _openai_at("https://api.groq.com/openai/v1"),
+    "fireworks_ai": _openai_at("https://api.fireworks.ai/inference/v1"),
+    "lepton_ai": _openai_at_or("https://api.lepton.ai/api/v1"),
+    
+    # Open Source Focused (OpenAI-compatible)
+    "together_ai": _openai_at("https://api.together.xyz/v1"),
+    # Hugging Face Inference API
+    "huggingface": _openai_at("https://api-inference.huggingface.co/v1"),
+    # Note: Replicate has different API structure, this might need custom implementation
+    "replicate": _openai_at_or("https://api.replicate.com/v1"),
+    
+    # Enterprise & Specialized
+    # Cohere has its own SDK, but also supports OpenAI-compatible endpoints
+    "cohere": _openai_at("https://api.cohere.ai/v1"),
+    "mistral_ai": _openai_at("https://api.mistral.ai/v1"),
+    "ai21_labs": _openai_at("https://api.ai21.com/studio/v1"),
+    "deepseek": _openai_at("https://api.deepseek.com/v1"),
+    "aleph_alpha": _openai_at("https://api.aleph-alpha.com/v1"),
+    "perplexity": _openai_at("https://api.perplexity.ai"),
+    
+    # Cloud Platform Services
+    # Azure OpenAI requires special endpoint format
+    "azure_openai": _requiring_endpoint(
+        _openai_at_endpoint, "api_endpoint required for Azure OpenAI (format: https://{resource}.openai.azure.com)"
+    ),
+    # Bedrock requires AWS SDK, would need custom implementation
+    "amazon_bedrock": _requiring_endpoint(_custom_at_endpoint, "api_endpoint required for Amazon Bedrock"),
+    "cloudflare_ai": _openai_at("https://api.cloudflare.com/client/v4/accounts/{account_id}/ai/v1"),
+    # Google AI Studio / Gemini API
+    "google_ai": _openai_at("https://generativelanguage.googleapis.com/v1"),
+    
+    # Development & Deployment Platforms
+    "anyscale": _openai_at_or("https://api.endpoints.anyscale.com/v1"),
+    "baseten": _requiring_endpoint(_openai_at_endpoint, "api_endpoint required for Baseten"),
+    "modal": _requiring_endpoint(_custom_at_endpoint, "api_endpoint required for Modal"),
+    
+    # Local & Custom
+    "openai_compatible": _requiring_endpoint(_custom_at_endpoint, "api_endpoint required for OpenAI Compatible provider"),
+}
+
+
+# Providers memoized by create_ai_provider. They hold no connections of their
+# own (SDK clients are shared per event loop), so one instance per distinct
+# set of arguments is enough. Built from worker threads, hence the lock
+PROVIDERS_MAXSIZE = 128
+_providers: LRUCache = LRUCache(maxsize=PROVIDERS_MAXSIZE)
+_providers_lock = threading.Lock()
+
+
+def clear_provider_cache() -> None:
+    """Forget every memoized provider (after rotating or deleting keys)."""
+    with _providers_lock:
+        _providers.clear()
+
+
+def _cached_factory(
+    factory: Callable[[str, str, Optional[str]], AIProvider],
+    provider_type: str,
+    api_key: str,
+    model_name: str,
+    api_endpoint: Optional[str]
+) -> AIProvider:
+    """Get the memoized provider for these arguments, building it on a miss."""
+    # Key by digest so raw API keys are not kept as dict keys
+    key = (provider_type, model_name, api_endpoint, hashlib.sha256(api_key.encode()).hexdigest())
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            provider = _providers[key] = factory(api_key, model_name, api_endpoint)
+    return provider
 
 
 def create_ai_provider(
@@ -394,86 +739,11 @@ def create_ai_provider(
     
     Returns:
         AIProvider instance
-    """
-    # Native OpenAI
-    if provider_type == "openai":
-        return OpenAIProvider(api_key, model_name, base_url=api_endpoint)
-    
-    # Native Anthropic
-    elif provider_type == "anthropic":
-        return AnthropicProvider(api_key, model_name)
-    
-    # Aggregators & Routers (OpenAI-compatible)
-    elif provider_type == "openrouter":
-        return OpenAIProvider(api_key, model_name, base_url="https://openrouter.ai/api/v1")
-    
-    # Ultra-Fast Inference Providers (OpenAI-compatible)
-    elif provider_type == "groq":
-        return OpenAIProvider(api_key, model_name, base_url="https://api.groq.com/openai/v1")
-    elif provider_type == "fireworks_ai":
-        return OpenAIProvider(api_key, model_name, base_url="https://api.fireworks.ai/inference/v1")
-    elif provider_type == "lepton_ai":
-        return OpenAIProvider(api_key, model_name, base_url=api_endpoint or "https://api.lepton.ai/api/v1")
-    
-    # Open Source Focused (OpenAI-compatible)
-    elif provider_type == "together_ai":
-        return OpenAIProvider(api_key, model_name, base_url="https://api.together.xyz/v1")
-    elif provider_type == "huggingface":
-        # Hugging Face Inference API
-        return OpenAIProvider(api_key, model_name, base_url="https://api-inference.huggingface.co/v1")
-    elif provider_type == "replicate":
-        # Note: Replicate has different API structure, this might need custom implementation
-        return OpenAIProvider(api_key, model_name, base_url=api_endpoint or "https://api.replicate.com/v1")
     
-    # Enterprise & Specialized
-    elif provider_type == "cohere":
-        # Cohere has its own SDK, but also supports OpenAI-compatible endpoints
-        return OpenAIProvider(api_key, model_name, base_url="https://api.cohere.ai/v1")
-    elif provider_type == "mistral_ai":
-        return OpenAIProvider(api_key, model_name, base_url="https://api.mistral.ai/v1")
-    elif provider_type == "ai21_labs":
-        return OpenAIProvider(api_key, model_name, base_url="https://api.ai21.com/studio/v1")
-    elif provider_type == "deepseek":
-        return OpenAIProvider(api_key, model_name, base_url="https://api.deepseek.com/v1")
-    elif provider_type == "aleph_alpha":
-        return OpenAIProvider(api_key, model_name, base_url="https://api.aleph-alpha.com/v1")
-    elif provider_type == "perplexity":
-        return OpenAIProvider(api_key, model_name, base_url="https://api.perplexity.ai")
-    
-    # Cloud Platform Services
-    elif provider_type == "azure_openai":
-        # Azure OpenAI requires special endpoint format
-        if not api_endpoint:
-            raise ValueError("api_endpoint required for Azure OpenAI (format: https://{resource}.openai.azure.com)")
-        return OpenAIProvider(api_key, model_name, base_url=api_endpoint)
-    elif provider_type == "amazon_bedrock":
-        # Bedrock requires AWS SDK, would need custom implementation
-        if not api_endpoint:
-            raise ValueError("api_endpoint required for Amazon Bedrock")
-        return CustomProvider(api_endpoint, api_key, model_name)
-    elif provider_type == "cloudflare_ai":
-        return OpenAIProvider(api_key, model_name, base_url="https://api.cloudflare.com/client/v4/accounts/{account_id}/ai/v1")
-    elif provider_type == "google_ai":
-        # Google AI Studio / Gemini API
-        return OpenAIProvider(api_key, model_name, base_url="https://generativelanguage.googleapis.com/v1")
-    
-    # Development & Deployment Platforms
-    elif provider_type == "anyscale":
-        return OpenAIProvider(api_key, model_name, base_url=api_endpoint or "https://api.endpoints.anyscale.com/v1")
-    elif provider_type == "baseten":
-        if not api_endpoint:
-            raise ValueError("api_endpoint required for Baseten")
-        return OpenAIProvider(api_key, model_name, base_url=api_endpoint)
-    elif provider_type == "modal":
-        if not api_endpoint:
-            raise ValueError("api_endpoint required for Modal")
-        return CustomProvider(api_endpoint, api_key, model_name)
-    
-    # Local & Custom
-    elif provider_type == "openai_compatible":
-        if not api_endpoint:
-            raise ValueError("api_endpoint required for OpenAI Compatible provider")
-        return CustomProvider(api_endpoint, api_key, model_name)
-    
-    else:
+    Instances are memoized per distinct set of arguments; call
+    clear_provider_cache() after rotating keys.
+    """
+    factory = _PROVIDER_FACTORIES.get(provider_type)
+    if factory is None:
         raise ValueError(f"Unknown provider type: {provider_type}. Supported providers: openai, anthropic, groq, together_ai, openrouter, and many more.")
+    return _cached_factory(factory, provider_type, api_key, model_name, api_endpoint)
@@ -3,13 +3,30 @@ Model Context Protocol (MCP) client for AI agent integration.
 """
 import asyncio
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from cachetools import TTLCache
 import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from src.models import ContentNode
 
+# Search results by (operation, normalized query, limit); AI jobs often repeat
+# the same prompt, and block mutations clear the cache (see clear_search_cache)
+MCP_CACHE_TTL = 300
+MCP_CACHE_MAXSIZE = 1024
+_search_cache: TTLCache = TTLCache(maxsize=MCP_CACHE_MAXSIZE, ttl=MCP_CACHE_TTL)
+_search_cache_lock = asyncio.Lock()
+
+
+def _search_cache_key(operation: str, query: str, limit: int) -> Tuple[str, str, int]:
+    return (operation, query.strip().lower(), limit)
+
+
+def clear_search_cache() -> None:
+    """Drop memoized MCP search results, e.g. after a block changes."""
+    _search_cache.clear()
+
 
 class MCPClient:
     """
@@ -30,6 +47,12 @@ class MCPClient:
         Search for existing blocks that match the query using MCP.
         This provides context to AI about what content already exists.
         """
+        key = _search_cache_key("search_blocks", query, limit)
+        async with _search_cache_lock:
+            cached = _search_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
             # Search in database
             search_pattern = f"%{query}%"
@@ -42,7 +65,7 @@ class MCPClient:
             blocks = result.scalars().all()
             
             # Format for MCP response (convert UUIDs to strings)
-            return [
+            results = [
                 {
                     "id": str(block.id),
                     "title": block.title,
@@ -58,6 +81,11 @@ class MCPClient:
         except Exception as e:
             print(f"Error searching blocks via MCP: {e}")
             return []
+
+        # Only successful lookups are cached; errors are retried next time
+        async with _search_cache_lock:
+            _search_cache[key] = results
+        return results
     
     async def get_block_context(
         self,
@@ -168,13 +196,16 @@ class MCPClient:
         await self.client.aclose()
 
 
-# Global MCP client instance
+# Global MCP client instance, shared by all jobs (one HTTP connection pool)
 _mcp_client: Optional[MCPClient] = None
+_mcp_client_lock = asyncio.Lock()
 
 
 async def get_mcp_client() -> MCPClient:
     """Get or create MCP client instance."""
     global _mcp_client
     if _mcp_client is None:
-        _mcp_client = MCPClient()
+        async with _mcp_client_lock:
+            if _mcp_client is None:
+                _mcp_client = MCPClient()
     return _mcp_client
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import Optional, Dict, Any, List
+import time
 import uuid
 
 try:
@@ -31,8 +32,13 @@ from ..config import settings
 
 INDEX_NAME = "content_nodes"
 
+# Seconds to wait before retrying a failed bootstrap, so searches fall back to
+# the database immediately instead of paying Meilisearch timeouts every request
+BOOTSTRAP_RETRY_SECONDS = 30.0
+
 _client: Optional[Client] = None
 _initialized: bool = False
+_bootstrap_failed_at: Optional[float] = None
 
 
 def get_client() -> Client:
@@ -44,15 +50,24 @@ def get_client() -> Client:
 
 def ensure_index_bootstrapped() -> None:
     """Create index and configure filterable/searchable attributes if missing."""
-    global _initialized
+    global _initialized, _bootstrap_failed_at
     if _initialized:
         return
+    if (
+        _bootstrap_failed_at is not None
+        and time.monotonic() - _bootstrap_failed_at < BOOTSTRAP_RETRY_SECONDS
+    ):
+        raise RuntimeError("Search index bootstrap recently failed; retry pending")
 
     client = get_client()
     try:
         client.get_index(INDEX_NAME)
     except Exception:
-        client.create_index(INDEX_NAME, {"primaryKey": "id"})
+        try:
+            client.create_index(INDEX_NAME, {"primaryKey": "id"})
+        except Exception:
+            _bootstrap_failed_at = time.monotonic()
+            raise
 
     # Settings: filter on booleans and enums; search over relevant fields
     index = client.index(INDEX_NAME)
@@ -69,6 +84,7 @@ def ensure_index_bootstrapped() -> None:
         pass
 
     _initialized = True
+    _bootstrap_failed_at = None
 
 
 def serialize_node(node) -> Dict[str, Any]:
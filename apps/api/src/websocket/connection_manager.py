@@ -1,14 +1,30 @@
 """
 WebSocket connection manager for real-time updates.
 """
-from typing import Dict, Set, List
+from typing import Dict, Set, List, Optional
 from fastapi import WebSocket
 import json
 import asyncio
 import logging
 
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Clients requesting this subprotocol get MessagePack binary frames, not JSON text
+MSGPACK_SUBPROTOCOL = "msgpack"
+
+
+def negotiate_subprotocol(requested: List[str]) -> Optional[str]:
+    """Pick the subprotocol to accept from the client's offered list."""
+    if MSGPACK_AVAILABLE and MSGPACK_SUBPROTOCOL in requested:
+        return MSGPACK_SUBPROTOCOL
+    return None
+
 
 class ConnectionManager:
     """Manages WebSocket connections for real-time updates."""
@@ -18,17 +34,20 @@ class ConnectionManager:
         self.active_connections: Dict[str, Set[WebSocket]] = {}
         # websocket -> user_id mapping
         self.connection_users: Dict[WebSocket, str] = {}
+        # connections that negotiated MessagePack
+        self.msgpack_connections: Set[WebSocket] = set()
         self._lock = asyncio.Lock()
     
-    async def connect(self, websocket: WebSocket, user_id: str):
+    async def connect(self, websocket: WebSocket, user_id: str, subprotocol: Optional[str] = None):
         """
         Connect a new WebSocket for a user.
         
         Args:
             websocket: WebSocket connection
             user_id: User ID
+            subprotocol: Negotiated subprotocol (see negotiate_subprotocol)
         """
-        await websocket.accept()
+        await websocket.accept(subprotocol=subprotocol)
         
         async with self._lock:
             if user_id not in self.active_connections:
@@ -36,6 +55,8 @@ class ConnectionManager:
             
             self.active_connections[user_id].add(websocket)
             self.connection_users[websocket] = user_id
+            if subprotocol == MSGPACK_SUBPROTOCOL:
+                self.msgpack_connections.add(websocket)
         
         logger.info(f"WebSocket connected for user {user_id}")
     
@@ -58,8 +79,13 @@ class ConnectionManager:
                         del self.active_connections[user_id]
                 
                 del self.connection_users[websocket]
+                self.msgpack_connections.discard(websocket)
                 logger.info(f"WebSocket disconnected for user {user_id}")
     
+    def has_subscribers(self, user_id: str) -> bool:
+        """Whether the user has at least one open connection."""
+        return user_id in self.active_connections
+    
     async def send_personal_message(self, message: dict, user_id: str):
         """
         Send message to all connections of a specific user.
@@ -71,17 +97,9 @@ class ConnectionManager:
         if user_id not in self.active_connections:
             return
         
-        message_text = json.dumps(message)
-        
         # Create a copy of connections to avoid modification during iteration
         connections = list(self.active_connections[user_id])
-        
-        for connection in connections:
-            try:
-                await connection.send_text(message_text)
-            except Exception as e:
-                logger.error(f"Error sending message to user {user_id}: {e}")
-                await self.disconnect(connection)
+        await self._send_all(connections, message, f"Error sending message to user {user_id}")
     
     async def broadcast(self, message: dict):
         """
@@ -90,18 +108,43 @@ class ConnectionManager:
         Args:
             message: Message data (will be JSON serialized)
         """
-        message_text = json.dumps(message)
-        
         # Get all websockets
         all_connections = []
         for connections in self.active_connections.values():
             all_connections.extend(connections)
         
-        for connection in all_connections:
+        await self._send_all(all_connections, message, "Error broadcasting message")
+    
+    async def send(self, websocket: WebSocket, message: dict):
+        """
+        Send a message to one connection in its negotiated encoding.
+        
+        Args:
+            websocket: WebSocket connection
+            message: Message data
+        """
+        if websocket in self.msgpack_connections:
+            await websocket.send_bytes(msgpack.packb(message, use_bin_type=True))
+        else:
+            await websocket.send_text(json.dumps(message))
+    
+    async def _send_all(self, connections: List[WebSocket], message: dict, error_prefix: str):
+        """Send to each connection, encoding the message at most once per format."""
+        message_text = None
+        message_bytes = None
+        
+        for connection in connections:
             try:
-                await connection.send_text(message_text)
+                if connection in self.msgpack_connections:
+                    if message_bytes is None:
+                        message_bytes = msgpack.packb(message, use_bin_type=True)
+                    await connection.send_bytes(message_bytes)
+                else:
+                    if message_text is None:
+                        message_text = json.dumps(message)
+                    await connection.send_text(message_text)
             except Exception as e:
-                logger.error(f"Error broadcasting message: {e}")
+                logger.error(f"{error_prefix}: {e}")
                 await self.disconnect(connection)
     
     async def send_ai_job_update(
@@ -120,15 +163,13 @@ class ConnectionManager:
             status: Job status (pending, running, completed, failed, cancelled)
             data: Additional data
         """
-        message = {
-            "type": "ai_job_update",
-            "job_id": job_id,
-            "status": status,
-            "data": data or {},
-            "timestamp": asyncio.get_event_loop().time()
-        }
+        # Skip building and encoding the payload when nobody is listening
+        if not self.has_subscribers(user_id):
+            return
         
-        await self.send_personal_message(message, user_id)
+        await self.send_personal_message(
+            self.ai_job_update_message(job_id, status, data), user_id
+        )
     
     async def send_ai_job_progress(
         self,
@@ -146,15 +187,48 @@ class ConnectionManager:
             progress: Progress percentage (0-100)
             message: Progress message
         """
-        data = {
+        # Skip building and encoding the payload when nobody is listening
+        if not self.has_subscribers(user_id):
+            return
+        
+        await self.send_personal_message(
+            self.ai_job_progress_message(job_id, progress, message), user_id
+        )
+    
+    @staticmethod
+    def ai_job_update_message(job_id: str, status: str, data: dict = None) -> dict:
+        """Build an ``ai_job_update`` message."""
+        return {
+            "type": "ai_job_update",
+            "job_id": job_id,
+            "status": status,
+            "data": data or {},
+            "timestamp": asyncio.get_event_loop().time()
+        }
+    
+    @staticmethod
+    def ai_job_progress_message(job_id: str, progress: float, message: str = None) -> dict:
+        """Build an ``ai_job_progress`` message."""
+        return {
             "type": "ai_job_progress",
             "job_id": job_id,
             "progress": progress,
             "message": message,
             "timestamp": asyncio.get_event_loop().time()
         }
+    
+    async def send_batch(self, messages: List[dict], user_id: str):
+        """
+        Send several messages to a user in one frame.
+        
+        Clients unpack ``{"type": "batch", "messages": [...]}`` and handle
+        each message in order.
         
-        await self.send_personal_message(data, user_id)
+        Args:
+            messages: Messages to deliver
+            user_id: Target user ID
+        """
+        await self.send_personal_message({"type": "batch", "messages": messages}, user_id)
     
     async def send_notification(
         self,
@@ -174,6 +248,10 @@ class ConnectionManager:
             message: Notification message
             data: Additional data
         """
+        # Skip building and encoding the payload when nobody is listening
+        if not self.has_subscribers(user_id):
+            return
+        
         notification = {
             "type": "notification",
             "notification_type": notification_type,
@@ -14,6 +14,7 @@ if str(PKG_ROOT) not in sys.path:
 
 from src.main import app
 from src.database import Base, get_db
+from src.auth import jwt_manager
 from src.config import settings
 
 # Use in-memory SQLite for reliable, isolated tests
@@ -93,3 +94,14 @@ async def test_user(db_session):
     await db_session.commit()
     await db_session.refresh(user)
     return user
+
+
+@pytest.fixture
+def auth_headers():
+    """Build bearer headers for a user, minted directly to bypass the login rate limiter"""
+    def build(user) -> dict:
+        token = jwt_manager.create_access_token(
+            {"sub": user.username, "id": str(user.id), "role": user.role.value}
+        )
+        return {"Authorization": f"Bearer {token}"}
+    return build
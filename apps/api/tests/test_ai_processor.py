@@ -0,0 +1,120 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from src.ai_config_models import AIAgentType, AIConfiguration, AIJob, AIJobStatus, AIProvider
+from src.services import ai_processor
+from src.services.ai_processor import AIJobProcessor, _JobUpdates
+from src.websocket.connection_manager import ConnectionManager
+
+
+class RecordingManager(ConnectionManager):
+    """Connection manager with one subscribed user that records every frame."""
+
+    def __init__(self):
+        super().__init__()
+        self.frames = []
+
+    def has_subscribers(self, user_id):
+        return True
+
+    async def send_personal_message(self, message, user_id):
+        self.frames.append(message)
+
+    async def send_batch(self, messages, user_id):
+        self.frames.append({"type": "batch", "messages": messages})
+
+
+@pytest.mark.asyncio
+async def test_job_updates_drop_repeated_progress():
+    manager = RecordingManager()
+    updates = _JobUpdates(manager, "user", "job", interval=0)
+
+    await updates.update(10, "Working")
+    await updates.update(10, "Working")
+    await updates.update(20, "Working")
+
+    assert [frame["progress"] for frame in manager.frames] == [10, 20]
+
+
+@pytest.mark.asyncio
+async def test_job_updates_flush_queued_messages_in_one_frame():
+    manager = RecordingManager()
+    updates = _JobUpdates(manager, "user", "job", interval=0.05)
+
+    await updates.update(10, "Started")
+    await updates.update(20, "Halfway")
+    await updates.update(30, "Almost")
+    await updates.status("running", {"message": "still going"})
+
+    # The first update goes out at once, the rest wait for the interval
+    assert [frame["progress"] for frame in manager.frames] == [10]
+
+    await asyncio.sleep(0.1)
+
+    assert len(manager.frames) == 2
+    batch = manager.frames[1]
+    assert batch["type"] == "batch"
+    assert [message["type"] for message in batch["messages"]] == ["ai_job_progress", "ai_job_update"]
+    assert batch["messages"][0]["progress"] == 30
+
+
+@pytest.mark.asyncio
+async def test_job_updates_finish_sends_queued_messages_immediately():
+    manager = RecordingManager()
+    updates = _JobUpdates(manager, "user", "job", interval=10)
+
+    await updates.update(10, "Started")
+    await updates.update(90, "Saving")
+    await updates.finish("completed", {"message": "done"})
+
+    assert len(manager.frames) == 2
+    assert [message["type"] for message in manager.frames[1]["messages"]] == ["ai_job_progress", "ai_job_update"]
+    assert manager.frames[1]["messages"][1]["status"] == "completed"
+    assert updates._flush_task is None
+
+
+@pytest.mark.asyncio
+async def test_process_job_skips_jobs_that_are_not_pending(db_session, test_user, monkeypatch):
+    manager = RecordingManager()
+    monkeypatch.setattr(ai_processor, "_ws_manager", lambda: manager)
+
+    def unexpected_provider(*args, **kwargs):
+        raise AssertionError("a non-pending job must not reach the provider")
+
+    monkeypatch.setattr(ai_processor, "create_ai_provider", unexpected_provider)
+
+    now = datetime.now(timezone.utc)
+    config = AIConfiguration(
+        id=uuid.uuid4(),
+        user_id=test_user.id,
+        name="Creator",
+        provider=AIProvider.OPENAI,
+        agent_type=AIAgentType.CONTENT_CREATOR,
+        model_name="gpt-4",
+        temperature={"value": 0.7},
+        max_tokens={"value": 100},
+        created_at=now,
+        updated_at=now,
+    )
+    job = AIJob(
+        id=uuid.uuid4(),
+        configuration_id=config.id,
+        user_id=test_user.id,
+        job_type=AIAgentType.CONTENT_CREATOR,
+        status=AIJobStatus.RUNNING,
+        input_prompt="Python",
+        created_at=now,
+        updated_at=now,
+    )
+    db_session.add_all([config, job])
+    await db_session.commit()
+
+    await AIJobProcessor(db_session).process_job(str(job.id), str(config.id))
+
+    await db_session.refresh(job)
+    assert job.status == AIJobStatus.RUNNING
+    assert job.updated_at.replace(tzinfo=None) == now.replace(tzinfo=None)
+    assert manager.frames == []
@@ -0,0 +1,153 @@
+import pytest
+
+from src.services import ai_providers
+from src.services.ai_providers import (
+    AIProvider,
+    _cache_deterministic,
+    clear_provider_cache,
+    clear_response_cache,
+    create_ai_provider,
+)
+
+
+class FakeProvider(AIProvider):
+    def __init__(self, results, api_key="sk-test", model_name="fake"):
+        self.results = list(results)
+        self.api_key = api_key
+        self.model_name = model_name
+        self.calls = 0
+
+    @_cache_deterministic
+    async def generate(self, prompt, system_prompt=None, temperature=0.7, max_tokens=2000, tools=None):
+        self.calls += 1
+        return self.results.pop(0)
+
+    async def generate_stream(self, prompt, system_prompt=None, temperature=0.7, max_tokens=2000, usage=None):
+        yield ""
+
+
+def ok(content):
+    return {"content": content, "tokens_used": {"prompt": 3, "completion": 5, "total": 8}}
+
+
+@pytest.fixture(autouse=True)
+def empty_response_cache():
+    clear_response_cache()
+    yield
+    clear_response_cache()
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_returns_copy_with_zero_tokens():
+    provider = FakeProvider([ok("hello")])
+
+    first = await provider.generate("hi", temperature=0)
+    second = await provider.generate("hi", temperature=0.0)
+
+    assert provider.calls == 1
+    assert first["tokens_used"]["total"] == 8
+    assert second["content"] == "hello"
+    assert second["tokens_used"] == {"prompt": 0, "completion": 0, "total": 0}
+
+    second["content"] = "changed"
+    third = await provider.generate("hi", temperature=0)
+    assert third["content"] == "hello"
+
+
+@pytest.mark.asyncio
+async def test_cache_skips_errors_and_empty_content():
+    provider = FakeProvider([
+        {"content": "", "error": "boom", "tokens_used": {}},
+        ok(""),
+        ok("done"),
+    ])
+
+    assert (await provider.generate("hi", temperature=0))["error"] == "boom"
+    assert (await provider.generate("hi", temperature=0))["content"] == ""
+    assert (await provider.generate("hi", temperature=0))["content"] == "done"
+    assert provider.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_is_keyed_per_api_key_and_skips_sampled_requests():
+    first = FakeProvider([ok("a")], api_key="sk-one")
+    second = FakeProvider([ok("b")], api_key="sk-two")
+
+    assert (await first.generate("hi", temperature=0))["content"] == "a"
+    assert (await second.generate("hi", temperature=0))["content"] == "b"
+
+    sampled = FakeProvider([ok("x"), ok("y")])
+    assert (await sampled.generate("hi"))["content"] == "x"
+    assert (await sampled.generate("hi"))["content"] == "y"
+
+
+def test_create_ai_provider_memoizes_without_keeping_the_key(monkeypatch):
+    monkeypatch.setitem(
+        ai_providers._PROVIDER_FACTORIES,
+        "fake",
+        lambda api_key, model_name, api_endpoint: FakeProvider([], api_key, model_name),
+    )
+    clear_provider_cache()
+
+    provider = create_ai_provider("fake", "sk-secret", "m")
+    assert create_ai_provider("fake", "sk-secret", "m") is provider
+    assert create_ai_provider("fake", "sk-other", "m") is not provider
+    assert not any("sk-secret" in key for key in ai_providers._providers)
+
+    clear_provider_cache()
+    assert create_ai_provider("fake", "sk-secret", "m") is not provider
+
+
+class ScriptedProvider(AIProvider):
+    """Answers each prompt from its own queue of results (or exceptions)."""
+
+    def __init__(self, script):
+        self.script = {prompt: list(results) for prompt, results in script.items()}
+        self.calls = []
+
+    async def generate(self, prompt, system_prompt=None, temperature=0.7, max_tokens=2000, tools=None):
+        self.calls.append(prompt)
+        result = self.script[prompt].pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def generate_stream(self, prompt, system_prompt=None, temperature=0.7, max_tokens=2000, usage=None):
+        yield ""
+
+
+def rate_limited():
+    return {"error": "Rate limit exceeded.", "error_type": "RateLimitError", "status_code": 429, "content": None}
+
+
+@pytest.mark.asyncio
+async def test_generate_many_keeps_order_and_retries_rate_limits(monkeypatch):
+    monkeypatch.setattr(ai_providers, "RATE_LIMIT_BACKOFF_BASE", 0)
+    failure = RuntimeError("boom")
+    provider = ScriptedProvider({
+        "a": [rate_limited(), rate_limited(), ok("A")],
+        "b": [failure],
+        "c": [ok("C")],
+        "d": [{"error": "429 in the model name", "status_code": 400, "content": None}],
+    })
+
+    results = await provider.generate_many(["a", "b", "c", "d"], concurrency=2)
+
+    assert results[0]["content"] == "A"
+    assert results[1] is failure
+    assert results[2]["content"] == "C"
+    assert results[3]["status_code"] == 400
+    assert provider.calls.count("a") == 3
+    assert provider.calls.count("d") == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_many_gives_up_after_the_retry_limit(monkeypatch):
+    monkeypatch.setattr(ai_providers, "RATE_LIMIT_BACKOFF_BASE", 0)
+    attempts = ai_providers.RATE_LIMIT_RETRIES
+    provider = ScriptedProvider({"a": [rate_limited() for _ in range(attempts)]})
+
+    [result] = await provider.generate_many(["a"])
+
+    assert result["status_code"] == 429
+    assert len(provider.calls) == attempts
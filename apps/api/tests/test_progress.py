@@ -0,0 +1,100 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import ContentNode, NodeLevel
+
+
+async def create_block(db_session: AsyncSession, user, slug: str) -> ContentNode:
+    block = ContentNode(
+        title=f"Block {slug}",
+        content="Block content",
+        slug=slug,
+        level=NodeLevel.BLOCK,
+        created_by_id=user.id
+    )
+    db_session.add(block)
+    await db_session.commit()
+    await db_session.refresh(block)
+    return block
+
+
+@pytest.mark.asyncio
+async def test_progress_etag_changes_with_mastery(client: AsyncClient, db_session: AsyncSession, test_user, auth_headers):
+    """Test /users/me/progress ETag round-trips and changes on mark/unmark"""
+    headers = auth_headers(test_user)
+    block = await create_block(db_session, test_user, "etag-block")
+
+    response = await client.get("/v1/users/me/progress", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == []
+    empty_etag = response.headers["etag"]
+
+    response = await client.get("/v1/users/me/progress", headers={**headers, "If-None-Match": empty_etag})
+    assert response.status_code == 304
+
+    response = await client.post(f"/v1/blocks/{block.id}/master", headers=headers)
+    assert response.status_code == 201
+
+    response = await client.get("/v1/users/me/progress", headers={**headers, "If-None-Match": empty_etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    marked_etag = response.headers["etag"]
+    assert marked_etag != empty_etag
+
+    response = await client.delete(f"/v1/blocks/{block.id}/master", headers=headers)
+    assert response.status_code == 200
+
+    response = await client.get("/v1/users/me/progress", headers={**headers, "If-None-Match": marked_etag})
+    assert response.status_code == 200
+    assert response.json() == []
+    assert response.headers["etag"] != marked_etag
+
+
+@pytest.mark.asyncio
+async def test_mark_block_mastered_is_idempotent(client: AsyncClient, db_session: AsyncSession, test_user, auth_headers):
+    """Test marking twice keeps the first mastery timestamp"""
+    headers = auth_headers(test_user)
+    block = await create_block(db_session, test_user, "mastered-block")
+
+    response = await client.post(f"/v1/blocks/{block.id}/master", headers=headers)
+    assert response.status_code == 201
+    data = response.json()
+    assert data["message"] == "Block marked as mastered"
+    first_mastered_at = data["mastered_at"]
+
+    response = await client.post(f"/v1/blocks/{block.id}/master", headers=headers)
+    assert response.status_code == 201
+    data = response.json()
+    assert data["message"] == "Block already mastered"
+    assert data["mastered_at"] == first_mastered_at
+
+
+@pytest.mark.asyncio
+async def test_mark_block_mastered_rejects_path(client: AsyncClient, db_session: AsyncSession, test_user, auth_headers):
+    """Test a PATH id cannot be marked through the block endpoint"""
+    path = ContentNode(
+        title="Some Path",
+        content="Path description",
+        slug="some-path",
+        level=NodeLevel.PATH,
+        created_by_id=test_user.id
+    )
+    db_session.add(path)
+    await db_session.commit()
+    await db_session.refresh(path)
+
+    response = await client.post(f"/v1/blocks/{path.id}/master", headers=auth_headers(test_user))
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_mark_block_mastered_unknown_block(client: AsyncClient, test_user, auth_headers):
+    """Test marking a block that does not exist"""
+    response = await client.post(f"/v1/blocks/{uuid.uuid4()}/master", headers=auth_headers(test_user))
+    assert response.status_code == 404
+
+    response = await client.post("/v1/blocks/not-a-uuid/master", headers=auth_headers(test_user))
+    assert response.status_code == 400
@@ -32,3 +32,80 @@ async def test_search_special_characters(client: AsyncClient):
     response = await client.get(f"/v1/search?q={special_chars}")
     # 200 for success, 400 for invalid chars, 503 if Meilisearch unavailable
     assert response.status_code in [200, 400, 503]
+
+
+async def create_published_block(db_session, user, slug: str, title: str, content: str):
+    from src.models import ContentNode, NodeLevel
+
+    block = ContentNode(
+        title=title,
+        content=content,
+        slug=slug,
+        level=NodeLevel.BLOCK,
+        created_by_id=user.id,
+        is_published=True
+    )
+    db_session.add(block)
+    await db_session.commit()
+    return block
+
+
+def use_database_fallback(monkeypatch):
+    """Force the database search path and start from an empty response cache"""
+    from src.routers import search as search_router
+
+    def unavailable():
+        raise RuntimeError("Meilisearch unavailable")
+
+    monkeypatch.setattr(search_router, "ensure_index_bootstrapped", unavailable)
+    search_router._search_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_search_fallback_total_counts_all_matches(client: AsyncClient, db_session, test_user, monkeypatch):
+    """Test total reflects every match, not just the returned page"""
+    use_database_fallback(monkeypatch)
+    for i in range(5):
+        await create_published_block(db_session, test_user, f"walrus-{i}", f"Walrus fact {i}", "About walruses")
+
+    response = await client.get("/v1/search?q=walrus&limit=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["hits"]) == 2
+    assert data["total"] == 5
+
+
+@pytest.mark.asyncio
+async def test_search_fallback_escapes_like_wildcards(client: AsyncClient, db_session, test_user, monkeypatch):
+    """Test a literal % in the query only matches rows containing %"""
+    use_database_fallback(monkeypatch)
+    await create_published_block(db_session, test_user, "percent", "Interest rates", "Rates rose 5% this year")
+    await create_published_block(db_session, test_user, "no-percent", "Plain block", "Nothing special here")
+
+    response = await client.get("/v1/search", params={"q": "%"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert [hit["slug"] for hit in data["hits"]] == ["percent"]
+
+
+@pytest.mark.asyncio
+async def test_reindex_is_scheduled_in_background(client: AsyncClient, test_user, auth_headers, monkeypatch):
+    """Test /search/reindex answers 202 and hands the rebuild to a background task"""
+    from src.routers import search as search_router
+    from tests.conftest import TestSessionLocal
+
+    calls = []
+
+    async def fake_reindex_all(session):
+        calls.append(session)
+        return {"indexed": 0}
+
+    monkeypatch.setattr(search_router, "ensure_index_bootstrapped", lambda: None)
+    monkeypatch.setattr(search_router, "reindex_all", fake_reindex_all)
+    monkeypatch.setattr(search_router, "AsyncSessionLocal", TestSessionLocal)
+
+    response = await client.post("/v1/search/reindex", headers=auth_headers(test_user))
+    assert response.status_code == 202
+    assert response.json() == {"status": "accepted"}
+    assert len(calls) == 1
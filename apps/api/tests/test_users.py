@@ -256,4 +256,56 @@ async def test_get_users_admin_only(client: AsyncClient, db_session: AsyncSessio
     assert response.status_code == 200
     data = response.json()
     assert isinstance(data, list)
-    assert len(data) >= 2  # Should have at least the two users we created
\ No newline at end of file
+    assert len(data) >= 2  # Should have at least the two users we created
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_not_modified(client: AsyncClient, db_session: AsyncSession, auth_headers):
+    """Test /users/me answers 304 when the ETag still matches"""
+    user = await auth_manager.create_user(
+        db_session,
+        username="etaguser",
+        email="etag@example.com",
+        password="etagPassword123"
+    )
+
+    headers = auth_headers(user)
+
+    response = await client.get("/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = await client.get("/v1/users/me", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_update_preferences_merges_metadata(client: AsyncClient, test_user, auth_headers):
+    """Test preference updates merge into existing metadata instead of replacing it"""
+    headers = auth_headers(test_user)
+
+    response = await client.patch("/v1/users/me/preferences", json={"language": "en"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["metadata"] == {"language": "en"}
+
+    response = await client.patch("/v1/users/me/preferences", json={"publicProfile": False}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["metadata"] == {"language": "en", "publicProfile": False}
+
+
+@pytest.mark.asyncio
+async def test_update_me(client: AsyncClient, test_user, auth_headers):
+    """Test profile updates are returned without reloading the user"""
+    headers = auth_headers(test_user)
+
+    response = await client.patch(
+        "/v1/users/me",
+        json={"full_name": "Renamed User", "email": "renamed@example.com"},
+        headers=headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["full_name"] == "Renamed User"
+    assert data["email"] == "renamed@example.com"
+    assert data["created_at"] is not None
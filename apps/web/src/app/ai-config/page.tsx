@@ -63,7 +63,7 @@ export default function AIConfigPage() {
             // Update job status in real-time
             setActiveJobs(prev => prev.map(job => 
               job.id === update.job_id 
-                ? { ...job, status: update.status, output_data: update.data?.output_data }
+                ? { ...job, status: update.status }
                 : job
             ))
             
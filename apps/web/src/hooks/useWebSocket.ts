@@ -58,8 +58,13 @@ export function useWebSocket(
       ws.onmessage = (event) => {
         try {
           const message = JSON.parse(event.data) as WebSocketMessage
-          setLastMessage(message)
-          onMessage?.(message)
+          // The server may pack several messages into one frame
+          const messages: WebSocketMessage[] =
+            message.type === 'batch' ? message.messages : [message]
+          for (const m of messages) {
+            setLastMessage(m)
+            onMessage?.(m)
+          }
         } catch (error) {
           console.error('Failed to parse WebSocket message:', error)
         }
@@ -24,7 +24,7 @@ async def test_ai_job_workflow():
     from src.database import AsyncSessionLocal
     from src.ai_config_models import AIConfiguration, AIJob, AIAgentType, AIProvider, AIJobStatus
     from src.models import User
-    from src.services.ai_processor import AIJobProcessor, start_ai_job_background
+    from src.services.ai_processor import AIJobProcessor, run_ai_job
     from sqlalchemy import select
     from datetime import datetime
     import uuid
@@ -96,12 +96,12 @@ async def test_ai_job_workflow():
         print(f"    Status: {job.status}")
         print()
         
-        print("Step 4: Testing background task wrapper...")
+        print("Step 4: Testing background job runner...")
         try:
-            # This tests that the wrapper can be called
-            print("  Calling start_ai_job_background...")
-            start_ai_job_background(str(job.id), str(config.id))
-            print("  ✓ Background task wrapper called successfully")
+            # Scheduled the way the router's BackgroundTasks runs it
+            print("  Scheduling run_ai_job...")
+            task = asyncio.create_task(run_ai_job(str(job.id), str(config.id)))
+            print("  ✓ Background job runner scheduled successfully")
             print()
             
             # Wait a bit for the task to start
@@ -171,7 +171,7 @@ async def test_ai_job_workflow():
         print("  ✓ Database connection")
         print("  ✓ AI Configuration model")
         print("  ✓ AI Job model")
-        print("  ✓ Background task wrapper")
+        print("  ✓ Background job runner")
         print("  ✓ Direct job processing")
         print()
         